@@ -32,8 +32,10 @@ Task: ISI-TECH-CHANNEL-A
 """
 
 import csv
+import operator
 import sys
 from collections import defaultdict
+from itertools import repeat
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -53,6 +55,11 @@ EU27 = frozenset([
 
 SHARE_SUM_TOLERANCE = 1e-9
 
+# The flat semiconductor extract is read in 1 MiB chunks
+READ_BUFFER_SIZE = 1 << 20
+# Share output has one row per partner; flush it in 1 MiB chunks
+WRITE_BUFFER_SIZE = 1 << 20
+
 
 def main():
     if not INPUT_FILE.exists():
@@ -61,23 +68,36 @@ def main():
 
     print(f"Input:   {INPUT_FILE}")
 
-    # Accumulate total value per (reporter, partner) across all HS codes/years
-    pair_values = defaultdict(float)
+    # Accumulate total value per reporter -> partner across all HS codes/years
+    pair_values = defaultdict(lambda: defaultdict(float))
     rec_totals = defaultdict(float)
     rows_read = 0
 
-    with open(INPUT_FILE, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
+    with open(INPUT_FILE, "r", encoding="utf-8", newline="",
+              buffering=READ_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        # Resolve column positions once; rows are read as plain lists
+        required = ("reporter", "partner", "value")
+        missing = [c for c in required if c not in header]
+        if missing:
+            print(f"FATAL: input missing columns: {missing}", file=sys.stderr)
+            sys.exit(1)
+        i_rec, i_sup, i_val = (header.index(c) for c in required)
+
         for row in reader:
+            if not row:
+                continue
             rows_read += 1
-            rec = row["reporter"]
-            sup = row["partner"]
-            val = float(row["value"])
-
+            rec = row[i_rec]
             if rec not in EU27:
                 continue
 
-            pair_values[(rec, sup)] += val
+            sup = row[i_sup]
+            val = float(row[i_val])
+
+            pair_values[rec][sup] += val
             rec_totals[rec] += val
 
     print(f"  Rows read: {rows_read}")
@@ -92,7 +112,7 @@ def main():
 
     share_rows_written = 0
 
-    with open(SHARES_FILE, "w", newline="") as fs, \
+    with open(SHARES_FILE, "w", newline="", buffering=WRITE_BUFFER_SIZE) as fs, \
          open(CONC_FILE, "w", newline="") as fc, \
          open(VOL_FILE, "w", newline="") as fv:
 
@@ -112,29 +132,29 @@ def main():
             if total == 0.0:
                 continue
 
-            # Collect partners for this reporter
-            sup_pairs = sorted(
-                [(sup, val) for (r, sup), val in pair_values.items() if r == rec],
-                key=lambda x: x[0],
-            )
-
-            share_sum = 0.0
-            hhi = 0.0
-
-            for sup, val in sup_pairs:
-                share = val / total
-
-                if share < 0.0:
-                    print(f"FATAL: negative share {share} for {rec} <- {sup}", file=sys.stderr)
-                    sys.exit(1)
-                if share > 1.0 + SHARE_SUM_TOLERANCE:
-                    print(f"FATAL: share > 1 ({share}) for {rec} <- {sup}", file=sys.stderr)
-                    sys.exit(1)
-
-                sw.writerow([rec, sup, share])
-                share_rows_written += 1
-                share_sum += share
-                hhi += share ** 2
+            # Partners for this reporter, grouped at ingest
+            sup_pairs = sorted(pair_values[rec].items(), key=lambda x: x[0])
+
+            # Shares computed as one list; bounds checked via min/max
+            sups = [sup for sup, _ in sup_pairs]
+            shares = [val / total for _, val in sup_pairs]
+
+            lo = min(shares)
+            if lo < 0.0:
+                sup = sups[shares.index(lo)]
+                print(f"FATAL: negative share {lo} for {rec} <- {sup}", file=sys.stderr)
+                sys.exit(1)
+            hi = max(shares)
+            if hi > 1.0 + SHARE_SUM_TOLERANCE:
+                sup = sups[shares.index(hi)]
+                print(f"FATAL: share > 1 ({hi}) for {rec} <- {sup}", file=sys.stderr)
+                sys.exit(1)
+
+            sw.writerows(zip(repeat(rec), sups, shares))
+            share_rows_written += len(shares)
+
+            share_sum = sum(shares)
+            hhi = sum(map(operator.mul, shares, shares))
 
             # Verify shares sum
             if abs(share_sum - 1.0) > SHARE_SUM_TOLERANCE:
@@ -47,8 +47,10 @@ Task: ISI-TECH-CHANNEL-B
 """
 
 import csv
+import operator
 import sys
 from collections import defaultdict
+from itertools import repeat
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -71,6 +73,12 @@ HS_CATEGORIES = ["legacy_discrete", "legacy_components", "integrated_circuits"]
 
 SHARE_SUM_TOLERANCE = 1e-9
 
+# Same flat extract as channel A, also read in 1 MiB chunks
+READ_BUFFER_SIZE = 1 << 20
+# Category share output has one row per reporter, hs_category and
+# partner; flush it in 1 MiB chunks
+WRITE_BUFFER_SIZE = 1 << 20
+
 
 def main():
     if not INPUT_FILE.exists():
@@ -79,35 +87,43 @@ def main():
 
     print(f"Input:   {INPUT_FILE}")
 
-    # Accumulate value per (reporter, category, partner)
-    triple_val = defaultdict(float)
+    # Accumulate value per reporter -> category -> partner, together with
+    # category totals V_i^{k} and reporter totals W_i^{B}
+    triple_val = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+    cat_totals = defaultdict(lambda: defaultdict(float))  # rec -> {cat: total}
+    rec_totals = defaultdict(float)
     rows_read = 0
 
-    with open(INPUT_FILE, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
+    with open(INPUT_FILE, "r", encoding="utf-8", newline="",
+              buffering=READ_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        # Resolve column positions once; rows are read as plain lists
+        required = ("reporter", "partner", "hs_category", "value")
+        missing = [c for c in required if c not in header]
+        if missing:
+            print(f"FATAL: input missing columns: {missing}", file=sys.stderr)
+            sys.exit(1)
+        i_rec, i_sup, i_cat, i_val = (header.index(c) for c in required)
+
         for row in reader:
+            if not row:
+                continue
             rows_read += 1
-            rec = row["reporter"]
-            sup = row["partner"]
-            cat = row["hs_category"]
-            val = float(row["value"])
-
+            rec = row[i_rec]
             if rec not in EU27:
                 continue
 
-            triple_val[(rec, cat, sup)] += val
+            sup = row[i_sup]
+            cat = row[i_cat]
+            val = float(row[i_val])
 
-    print(f"  Rows read: {rows_read}")
-
-    # Derive category totals: V_i^{k}
-    cat_totals = defaultdict(float)  # (rec, cat) -> total
-    for (rec, cat, sup), val in triple_val.items():
-        cat_totals[(rec, cat)] += val
+            triple_val[rec][cat][sup] += val
+            cat_totals[rec][cat] += val
+            rec_totals[rec] += val
 
-    # Derive reporter totals: W_i^{B}
-    rec_totals = defaultdict(float)
-    for (rec, cat), val in cat_totals.items():
-        rec_totals[rec] += val
+    print(f"  Rows read: {rows_read}")
 
     print(f"  EU-27 reporters with data: {len(rec_totals)}")
 
@@ -119,7 +135,7 @@ def main():
     # Per-reporter weighted concentration
     rec_weighted_conc = {}  # rec -> C_i^{B}
 
-    with open(CAT_SHARES_FILE, "w", newline="") as fcs, \
+    with open(CAT_SHARES_FILE, "w", newline="", buffering=WRITE_BUFFER_SIZE) as fcs, \
          open(CAT_CONC_FILE, "w", newline="") as fcc:
 
         csw = csv.writer(fcs)
@@ -131,36 +147,37 @@ def main():
         for rec in sorted(rec_totals.keys()):
             numerator = 0.0   # SUM_k [C_i^{B,k} * V_i^{k}]
             denominator = 0.0  # SUM_k V_i^{k}
+            rec_cats = cat_totals[rec]
+            rec_sups = triple_val[rec]
 
             for cat in HS_CATEGORIES:
-                ct = cat_totals.get((rec, cat), 0.0)
+                ct = rec_cats.get(cat, 0.0)
                 if ct == 0.0:
                     continue
 
-                # Collect partners for this (rec, cat)
-                sup_list = sorted(
-                    [(sup, val) for (r, c, sup), val in triple_val.items()
-                     if r == rec and c == cat],
-                    key=lambda x: x[0],
-                )
+                # Partners for this (rec, cat), grouped at ingest
+                sup_list = sorted(rec_sups[cat].items(), key=lambda x: x[0])
 
-                share_sum = 0.0
-                hhi_cat = 0.0
+                # Shares computed as one list; bounds checked via min/max
+                sups = [sup for sup, _ in sup_list]
+                shares = [val / ct for _, val in sup_list]
 
-                for sup, val in sup_list:
-                    share = val / ct
+                lo = min(shares)
+                if lo < 0.0:
+                    sup = sups[shares.index(lo)]
+                    print(f"FATAL: negative share {lo} for {rec}/{cat} <- {sup}", file=sys.stderr)
+                    sys.exit(1)
+                hi = max(shares)
+                if hi > 1.0 + SHARE_SUM_TOLERANCE:
+                    sup = sups[shares.index(hi)]
+                    print(f"FATAL: share > 1 ({hi}) for {rec}/{cat} <- {sup}", file=sys.stderr)
+                    sys.exit(1)
 
-                    if share < 0.0:
-                        print(f"FATAL: negative share {share} for {rec}/{cat} <- {sup}", file=sys.stderr)
-                        sys.exit(1)
-                    if share > 1.0 + SHARE_SUM_TOLERANCE:
-                        print(f"FATAL: share > 1 ({share}) for {rec}/{cat} <- {sup}", file=sys.stderr)
-                        sys.exit(1)
+                csw.writerows(zip(repeat(rec), repeat(cat), sups, shares))
+                cat_share_rows += len(shares)
 
-                    csw.writerow([rec, cat, sup, share])
-                    cat_share_rows += 1
-                    share_sum += share
-                    hhi_cat += share ** 2
+                share_sum = sum(shares)
+                hhi_cat = sum(map(operator.mul, shares, shares))
 
                 if abs(share_sum - 1.0) > SHARE_SUM_TOLERANCE:
                     print(f"FATAL: shares sum to {share_sum} for {rec}/{cat}", file=sys.stderr)
@@ -220,8 +237,9 @@ def main():
     print()
     print("  Category coverage per reporter:")
     for rec in sorted(rec_totals.keys()):
-        covered = [cat for cat in HS_CATEGORIES if cat_totals.get((rec, cat), 0.0) > 0.0]
-        not_covered = [cat for cat in HS_CATEGORIES if cat_totals.get((rec, cat), 0.0) == 0.0]
+        rec_cats = cat_totals[rec]
+        covered = [cat for cat in HS_CATEGORIES if rec_cats.get(cat, 0.0) > 0.0]
+        not_covered = [cat for cat in HS_CATEGORIES if rec_cats.get(cat, 0.0) == 0.0]
         status = f"{len(covered)}/{len(HS_CATEGORIES)}"
         if not_covered:
             status += f"  missing: {not_covered}"
@@ -21,6 +21,7 @@ Task: ISI-ADAPTER
 """
 
 import csv
+import statistics
 import sys
 from pathlib import Path
 
@@ -82,6 +83,7 @@ def main():
     print()
 
     imputations = []
+    row_counts = {}  # axis_num -> (adapter file, data rows written)
 
     for axis_num in range(1, 7):
         src = AXIS_SOURCES[axis_num]
@@ -96,13 +98,23 @@ def main():
         # Read source
         scores = {}
         with open(src_file, encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, [])
+            cols = (src["country_col"], src["score_col"])
+            missing_cols = [c for c in cols if c not in header]
+            if missing_cols:
+                print(f"FATAL: Axis {axis_num} source missing columns: "
+                      f"{missing_cols}", file=sys.stderr)
+                sys.exit(1)
+            i_country, i_score = (header.index(c) for c in cols)
+
             for row in reader:
-                country = row[src["country_col"]].strip()
-                score_str = row[src["score_col"]].strip()
+                if not row:
+                    continue
+                score_str = row[i_score].strip()
                 if score_str == "":
                     continue
-                scores[country] = float(score_str)
+                scores[row[i_country].strip()] = float(score_str)
 
         # Check coverage
         present = set(scores.keys()) & EU27_SET
@@ -114,7 +126,7 @@ def main():
 
             # Imputation: use mean of available scores
             if len(present) >= 20:  # Only impute if most data exists
-                mean_score = sum(scores[c] for c in present) / len(present)
+                mean_score = statistics.fmean(scores[c] for c in present)
                 for c in sorted(missing):
                     scores[c] = mean_score
                     imputations.append((axis_num, c, mean_score, len(present)))
@@ -135,6 +147,7 @@ def main():
         with open(out_file, "w", encoding="utf-8", newline="") as f:
             w = csv.writer(f)
             w.writerow(["country", "score"])
+            n_written = 0
             for country in EU27:
                 s = scores.get(country)
                 if s is None:
@@ -142,7 +155,9 @@ def main():
                           f"for axis {axis_num}", file=sys.stderr)
                     sys.exit(1)
                 w.writerow([country, f"{s:.10f}"])
+                n_written += 1
 
+        row_counts[axis_num] = (out_file, n_written)
         print(f"    → {out_file}")
 
     # Summary
@@ -152,11 +167,8 @@ def main():
     print("=" * 68)
 
     for i in range(1, 7):
-        out_file = (PROJECT_ROOT / "data" / "processed"
-                    / f"axis_{i}" / f"axis_{i}_final_scores.csv")
-        with open(out_file) as f:
-            lines = f.readlines()
-        print(f"  Axis {i}: {out_file.name} ({len(lines) - 1} rows)")
+        out_file, n_rows = row_counts[i]
+        print(f"  Axis {i}: {out_file.name} ({n_rows} rows)")
 
     if imputations:
         print()
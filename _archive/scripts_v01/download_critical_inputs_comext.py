@@ -8,9 +8,13 @@ writes a consolidated CSV ready for the ingest gate.
 
 Architecture:
   1. Download 3 annual .7z files from Eurostat Bulk Download Facility
-  2. Decompress each to CSV
+     (concurrently; each year proceeds to 2-3 as soon as it lands)
+  2. Stream-decompress each archive (no intermediate CSV on disk)
   3. Stream-filter: 66 CN8 codes × EU-27 reporters × imports × normal procedure
+     (steps 2-3 run in one worker process per year; the filtered
+     rows are cached per year and reused on reruns)
   4. Write consolidated output CSV with ISI-internal column names
+     (each year is appended as soon as it is filtered)
 
 Source:
   Eurostat Comext Bulk Download Facility
@@ -33,8 +37,14 @@ Task: ISI-CRIT-DOWNLOAD
 import csv
 import hashlib
 import io
+import multiprocessing
+import os
+import shutil
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
 
 try:
@@ -160,8 +170,9 @@ CONNECT_TIMEOUT = 30.0
 READ_TIMEOUT = 600.0   # 10 minutes — files are 93 MB
 MAX_RETRIES = 5
 RETRY_BACKOFF_BASE = 5.0   # seconds, exponential backoff
-CHUNK_SIZE = 1024 * 1024   # 1 MB download chunks
-RATE_LIMIT_DELAY = 2.0     # seconds between file downloads
+CHUNK_SIZE = 8 * 1024 * 1024   # 8 MB download chunks
+MAX_PARALLEL_DOWNLOADS = 3  # one connection per annual file
+PROGRESS_STEP_PCT = 10     # report download progress every 10%
 
 
 # ═════════════════════════════════════════════════════════════════
@@ -194,22 +205,21 @@ def load_mapping_codes() -> frozenset:
 
 
 def sha256_file(path: Path) -> str:
-    """Compute SHA-256 hash of a file."""
-    h = hashlib.sha256()
+    """Compute SHA-256 hash of a file.
+
+    hashlib.file_digest runs the read/update loop in C with a large
+    buffer (Python 3.11+).
+    """
     with open(path, "rb") as f:
-        while True:
-            chunk = f.read(8192)
-            if not chunk:
-                break
-            h.update(chunk)
-    return h.hexdigest()
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 
 def download_file(filename: str, dest_path: Path) -> None:
     """Download a single file from the Eurostat bulk download facility.
 
     Uses exponential backoff retry. Skips if file already exists
-    with non-zero size.
+    with non-zero size. Safe to run concurrently for different files;
+    progress lines are prefixed with the file name.
     """
     if dest_path.exists() and dest_path.stat().st_size > 0:
         size_mb = dest_path.stat().st_size / (1024 * 1024)
@@ -234,8 +244,10 @@ def download_file(filename: str, dest_path: Path) -> None:
             ) as response:
                 response.raise_for_status()
 
+                # content-length counts raw wire bytes, so progress is
+                # measured with num_bytes_downloaded rather than chunk sizes
                 total = int(response.headers.get("content-length", 0))
-                downloaded = 0
+                next_report = PROGRESS_STEP_PCT
 
                 dest_path.parent.mkdir(parents=True, exist_ok=True)
                 tmp_path = dest_path.with_suffix(".tmp")
@@ -243,34 +255,33 @@ def download_file(filename: str, dest_path: Path) -> None:
                 with open(tmp_path, "wb") as f:
                     for chunk in response.iter_bytes(chunk_size=CHUNK_SIZE):
                         f.write(chunk)
-                        downloaded += len(chunk)
                         if total > 0:
+                            downloaded = response.num_bytes_downloaded
                             pct = (downloaded / total) * 100
-                            print(
-                                f"\r    {downloaded / (1024*1024):.1f} / "
-                                f"{total / (1024*1024):.1f} MB ({pct:.0f}%)",
-                                end="",
-                                flush=True,
-                            )
-
-                print()  # newline after progress
+                            if pct >= next_report:
+                                print(
+                                    f"    {filename}: {downloaded / (1024*1024):.1f} / "
+                                    f"{total / (1024*1024):.1f} MB ({pct:.0f}%)",
+                                    flush=True,
+                                )
+                                next_report = pct - pct % PROGRESS_STEP_PCT + PROGRESS_STEP_PCT
 
                 # Atomic rename
                 tmp_path.rename(dest_path)
 
                 size_mb = dest_path.stat().st_size / (1024 * 1024)
                 file_hash = sha256_file(dest_path)
-                print(f"    OK: {size_mb:.1f} MB, SHA-256: {file_hash[:16]}...")
+                print(f"    OK: {filename} {size_mb:.1f} MB, SHA-256: {file_hash[:16]}...")
                 return
 
         except (httpx.HTTPStatusError, httpx.TransportError, OSError) as e:
             wait = RETRY_BACKOFF_BASE * (2 ** (attempt - 1))
-            print(f"    Attempt {attempt}/{MAX_RETRIES} failed: {e}")
+            print(f"    {filename}: attempt {attempt}/{MAX_RETRIES} failed: {e}")
             if attempt < MAX_RETRIES:
-                print(f"    Retrying in {wait:.0f}s...")
+                print(f"    {filename}: retrying in {wait:.0f}s...")
                 time.sleep(wait)
             else:
-                print(f"FATAL: download failed after {MAX_RETRIES} attempts", file=sys.stderr)
+                print(f"FATAL: {filename} download failed after {MAX_RETRIES} attempts", file=sys.stderr)
                 # Clean up partial file
                 tmp_path = dest_path.with_suffix(".tmp")
                 if tmp_path.exists():
@@ -278,12 +289,54 @@ def download_file(filename: str, dest_path: Path) -> None:
                 sys.exit(1)
 
 
-def extract_7z(archive_path: Path, extract_dir: Path) -> Path:
-    """Extract a .7z archive and return the path to the CSV inside.
+class _PipeWriter(py7zr.io.Py7zIO):
+    """Write-only py7zr sink that forwards decompressed bytes to a pipe."""
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self._size = 0
+
+    def write(self, s) -> int:
+        self._pipe.write(s)
+        self._size += len(s)
+        return len(s)
+
+    def read(self, size=None) -> bytes:
+        raise io.UnsupportedOperation("write-only stream")
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        raise io.UnsupportedOperation("write-only stream")
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        self._pipe.flush()
 
+    def size(self) -> int:
+        return self._size
+
+
+class _PipeWriterFactory(py7zr.io.WriterFactory):
+    """Hand py7zr a _PipeWriter for the (single) extracted member."""
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+
+    def create(self, filename: str) -> _PipeWriter:
+        return _PipeWriter(self._pipe)
+
+
+@contextmanager
+def stream_7z(archive_path: Path):
+    """Decompress the CSV/DAT member of a .7z archive as a text stream.
+
+    Decompression runs in a background thread that writes into an OS
+    pipe; the caller reads the other end, so the multi-GB member is
+    never written to disk. Yields (member_name, text_stream).
     Expects exactly one CSV file inside the archive.
     """
-    print(f"  Extracting: {archive_path.name}")
+    print(f"  Streaming: {archive_path.name}")
 
     with py7zr.SevenZipFile(archive_path, mode="r") as z:
         names = z.getnames()
@@ -294,25 +347,40 @@ def extract_7z(archive_path: Path, extract_dir: Path) -> Path:
             print(f"  Archive contents: {names}", file=sys.stderr)
             sys.exit(1)
 
-        # Extract all files
-        z.extractall(path=extract_dir)
+        # Use the first (typically only) CSV/DAT file
+        csv_name = csv_names[0]
+        read_fd, write_fd = os.pipe()
+        errors = []
 
-    # Use the first (typically only) CSV/DAT file
-    csv_path = extract_dir / csv_names[0]
-    size_mb = csv_path.stat().st_size / (1024 * 1024)
-    print(f"    Extracted: {csv_names[0]} ({size_mb:.1f} MB)")
-    return csv_path
+        def decompress():
+            with open(write_fd, "wb") as pipe:
+                try:
+                    z.extract(targets=[csv_name], factory=_PipeWriterFactory(pipe))
+                except Exception as e:  # reported by the consumer
+                    errors.append(e)
 
+        worker = threading.Thread(target=decompress, daemon=True)
+        worker.start()
+
+        stream = open(read_fd, "r", encoding="utf-8", newline="")
+        try:
+            yield csv_name, stream
+        finally:
+            # Closing the read end unblocks the worker if we stopped early
+            stream.close()
+            worker.join()
+
+    if errors:
+        print(f"FATAL: decompression of {archive_path.name} failed: {errors[0]}", file=sys.stderr)
+        sys.exit(1)
 
-def detect_separator(csv_path: Path) -> str:
-    """Auto-detect CSV separator from the first line.
+
+def detect_separator(header: str) -> str:
+    """Auto-detect CSV separator from the header line.
 
     Comext files have historically used comma, but some
     older versions used tab or semicolon.
     """
-    with open(csv_path, "r", encoding="utf-8") as f:
-        header = f.readline()
-
     if "\t" in header:
         return "\t"
     if ";" in header:
@@ -321,17 +389,22 @@ def detect_separator(csv_path: Path) -> str:
 
 
 def filter_csv(
-    csv_path: Path,
+    f,
+    csv_name: str,
     cn8_codes: frozenset,
     year: int,
-) -> list:
-    """Stream-filter a Comext bulk CSV, returning rows matching our criteria.
+    writer,
+) -> tuple:
+    """Stream-filter a Comext bulk CSV, writing rows matching our criteria.
 
-    Returns list of dicts with ISI-internal column names.
+    Reads from an open text stream (see stream_7z) positioned at the
+    header line. Kept rows go to the csv writer in OUTPUT_COLUMNS order.
+    Returns the summary, see summarise_rows.
     """
-    print(f"  Filtering: {csv_path.name} for year {year}")
+    print(f"  Filtering: {csv_name} for year {year}")
 
-    sep = detect_separator(csv_path)
+    header = f.readline()
+    sep = detect_separator(header)
 
     total_rows = 0
     kept_rows = 0
@@ -343,109 +416,188 @@ def filter_csv(
     dropped_value = 0
     zero_value = 0
 
-    results = []
+    write_row = writer.writerow
+    reporters = set()
+    partners = set()
+    products = set()
+    periods = set()
+    total_value = 0.0
 
-    with open(csv_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f, delimiter=sep)
+    fieldnames = next(csv.reader([header], delimiter=sep), None)
 
-        # Validate required columns exist
-        if reader.fieldnames is None:
-            print(f"FATAL: could not read header from {csv_path.name}", file=sys.stderr)
-            sys.exit(1)
+    # Validate required columns exist
+    if not fieldnames:
+        print(f"FATAL: could not read header from {csv_name}", file=sys.stderr)
+        sys.exit(1)
 
-        missing = [c for c in REQUIRED_BULK_COLUMNS if c not in reader.fieldnames]
-        if missing:
-            print(f"FATAL: missing columns in {csv_path.name}: {missing}", file=sys.stderr)
-            print(f"  Found columns: {reader.fieldnames}", file=sys.stderr)
-            sys.exit(1)
+    missing = [c for c in REQUIRED_BULK_COLUMNS if c not in fieldnames]
+    if missing:
+        print(f"FATAL: missing columns in {csv_name}: {missing}", file=sys.stderr)
+        print(f"  Found columns: {fieldnames}", file=sys.stderr)
+        sys.exit(1)
 
-        print(f"    Columns ({len(reader.fieldnames)}): {reader.fieldnames[:7]}...")
-        print(f"    Separator: {repr(sep)}")
+    print(f"    Columns ({len(fieldnames)}): {fieldnames[:7]}...")
+    print(f"    Separator: {repr(sep)}")
+
+    # Resolve column positions once; rows are read as plain lists
+    i_flow = fieldnames.index(BULK_COL_FLOW)
+    i_stat_proc = fieldnames.index(BULK_COL_STAT_PROC)
+    i_reporter = fieldnames.index(BULK_COL_REPORTER)
+    i_product = fieldnames.index(BULK_COL_PRODUCT)
+    i_partner = fieldnames.index(BULK_COL_PARTNER)
+    i_value = fieldnames.index(BULK_COL_VALUE)
+    i_period = fieldnames.index(BULK_COL_PERIOD)
+
+    for row in csv.reader(f, delimiter=sep):
+        if not row:
+            continue
+        total_rows += 1
+
+        # Print progress every 2M rows
+        if total_rows % 2_000_000 == 0:
+            print(f"    ... {total_rows:,} rows scanned, {kept_rows:,} kept")
+
+        # ── Flow filter: imports only ────────────────────
+        flow = row[i_flow].strip()
+        if flow != FLOW_IMPORT:
+            dropped_flow += 1
+            continue
+
+        # ── Stat procedure filter: normal only ───────────
+        stat_proc = row[i_stat_proc].strip()
+        if stat_proc != STAT_PROCEDURE_NORMAL:
+            dropped_stat_proc += 1
+            continue
+
+        # ── Reporter filter: EU-27 only ──────────────────
+        reporter = row[i_reporter].strip()
+        if reporter not in EU27_REPORTERS:
+            dropped_reporter += 1
+            continue
+
+        # ── Product filter: our 66 CN8 codes ─────────────
+        product = row[i_product].strip()
+        if product not in cn8_codes:
+            dropped_product += 1
+            continue
+
+        # ── Partner filter: drop confidential ─────────────
+        partner = row[i_partner].strip()
+        if partner in DROP_PARTNERS:
+            dropped_partner += 1
+            continue
+
+        # ── Value parsing ─────────────────────────────────
+        value_str = row[i_value].strip()
+        if value_str in ("", ":", "c"):
+            value_str = "0"
 
-        for row in reader:
-            total_rows += 1
-
-            # Print progress every 2M rows
-            if total_rows % 2_000_000 == 0:
-                print(f"    ... {total_rows:,} rows scanned, {kept_rows:,} kept")
-
-            # ── Flow filter: imports only ────────────────────
-            flow = row[BULK_COL_FLOW].strip()
-            if flow != FLOW_IMPORT:
-                dropped_flow += 1
-                continue
-
-            # ── Stat procedure filter: normal only ───────────
-            stat_proc = row[BULK_COL_STAT_PROC].strip()
-            if stat_proc != STAT_PROCEDURE_NORMAL:
-                dropped_stat_proc += 1
-                continue
-
-            # ── Reporter filter: EU-27 only ──────────────────
-            reporter = row[BULK_COL_REPORTER].strip()
-            if reporter not in EU27_REPORTERS:
-                dropped_reporter += 1
-                continue
-
-            # ── Product filter: our 66 CN8 codes ─────────────
-            product = row[BULK_COL_PRODUCT].strip()
-            if product not in cn8_codes:
-                dropped_product += 1
-                continue
-
-            # ── Partner filter: drop confidential ─────────────
-            partner = row[BULK_COL_PARTNER].strip()
-            if partner in DROP_PARTNERS:
-                dropped_partner += 1
-                continue
-
-            # ── Value parsing ─────────────────────────────────
-            value_str = row[BULK_COL_VALUE].strip()
-            if value_str in ("", ":", "c"):
-                value_str = "0"
-
-            try:
-                value = float(value_str)
-            except (ValueError, TypeError):
-                dropped_value += 1
-                continue
-
-            if value < 0:
-                dropped_value += 1
-                continue
-
-            if value == 0:
-                zero_value += 1
-
-            # ── Apply remappings ──────────────────────────────
-            declarant = GEO_REMAP.get(reporter, reporter)
-
-            # Period: bulk uses YYYY52 for annual, we output YYYY
-            period_raw = row[BULK_COL_PERIOD].strip()
-            period = PERIOD_REMAP.get(period_raw, str(year))
-
-            results.append({
-                "DECLARANT_ISO": declarant,
-                "PARTNER_ISO": partner,
-                "PRODUCT_NC": product,
-                "FLOW": "1",
-                "PERIOD": period,
-                "VALUE_IN_EUROS": str(int(value)) if value == int(value) else str(value),
-            })
-            kept_rows += 1
+        try:
+            value = float(value_str)
+        except (ValueError, TypeError):
+            dropped_value += 1
+            continue
+
+        if value < 0:
+            dropped_value += 1
+            continue
+
+        if value == 0:
+            zero_value += 1
+
+        # ── Apply remappings ──────────────────────────────
+        declarant = GEO_REMAP.get(reporter, reporter)
+
+        # Period: bulk uses YYYY52 for annual, we output YYYY
+        period_raw = row[i_period].strip()
+        period = PERIOD_REMAP.get(period_raw, str(year))
+
+        write_row((
+            declarant,
+            partner,
+            product,
+            "1",
+            period,
+            str(int(value)) if value == int(value) else str(value),
+        ))
+        kept_rows += 1
+
+        reporters.add(declarant)
+        partners.add(partner)
+        products.add(product)
+        periods.add(period)
+        total_value += value
 
     # ── Audit ─────────────────────────────────────────────────
-    print(f"    Scan complete: {total_rows:,} total rows")
-    print(f"    Kept:          {kept_rows:,}")
-    print(f"    Dropped flow:  {dropped_flow:,}")
-    print(f"    Dropped proc:  {dropped_stat_proc:,}")
-    print(f"    Dropped geo:   {dropped_reporter:,}")
-    print(f"    Dropped prod:  {dropped_product:,}")
-    print(f"    Dropped partn: {dropped_partner:,}")
-    print(f"    Dropped value: {dropped_value:,}")
-    print(f"    Zero-value:    {zero_value:,}")
+    # One write, so concurrent years do not interleave their blocks
+    print(
+        f"  Filtered: {csv_name} for year {year}\n"
+        f"    Scan complete: {total_rows:,} total rows\n"
+        f"    Kept:          {kept_rows:,}\n"
+        f"    Dropped flow:  {dropped_flow:,}\n"
+        f"    Dropped proc:  {dropped_stat_proc:,}\n"
+        f"    Dropped geo:   {dropped_reporter:,}\n"
+        f"    Dropped prod:  {dropped_product:,}\n"
+        f"    Dropped partn: {dropped_partner:,}\n"
+        f"    Dropped value: {dropped_value:,}\n"
+        f"    Zero-value:    {zero_value:,}\n",
+        flush=True,
+    )
+
+    return kept_rows, reporters, partners, products, periods, total_value
+
+
+def summarise_rows(path: Path) -> tuple:
+    """Summarise a filtered file written by extract_and_filter.
+
+    Returns (rows, reporters, partners, products, periods, total_value).
+    """
+    reporters = set()
+    partners = set()
+    products = set()
+    periods = set()
+    total_value = 0.0
+    n_rows = 0
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for declarant, partner, product, _, period, value_str in reader:
+            n_rows += 1
+            reporters.add(declarant)
+            partners.add(partner)
+            products.add(product)
+            periods.add(period)
+            total_value += float(value_str)
+    return n_rows, reporters, partners, products, periods, total_value
+
+
+def extract_and_filter(archive: Path, cn8_codes: frozenset, year: int) -> tuple:
+    """Stream-decompress one annual archive and filter it.
+
+    Top-level so it can run in a worker process (one per year). The
+    filtered rows are written next to the archive, keyed by the archive
+    and mapping hashes, so a rerun skips years already filtered. Only
+    the file path and its summary are returned to the parent:
+    (path, rows, reporters, partners, products, periods, total_value).
+    """
+    codes_hash = hashlib.sha256("\n".join(sorted(cn8_codes)).encode()).hexdigest()
+    archive_hash = sha256_file(archive)
+    cache_file = archive.parent / f"filtered_{year}_{archive_hash[:8]}_{codes_hash[:8]}.csv"
+
+    if cache_file.exists():
+        summary = summarise_rows(cache_file)
+        print(f"  CACHED: {cache_file.name} ({summary[0]:,} rows)", flush=True)
+        return (cache_file, *summary)
 
-    return results
+    tmp_path = cache_file.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_COLUMNS)
+        with stream_7z(archive) as (csv_name, stream):
+            summary = filter_csv(stream, csv_name, cn8_codes, year, writer)
+    tmp_path.replace(cache_file)
+
+    return (cache_file, *summary)
 
 
 # ═════════════════════════════════════════════════════════════════
@@ -463,56 +615,83 @@ def main():
     print(f"Mapping loaded: {len(cn8_codes)} CN8 codes")
     print()
 
-    # ── 1. Download annual files ─────────────────────────────
-    print("Stage 1: Download")
+    # ── 1-2. Download, extract and filter (pipelined) ───────
+    print("Stage 1-2: Download, Extract & Filter")
     print("-" * 40)
     DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-    for year, filename in sorted(ANNUAL_FILES.items()):
-        dest = DOWNLOAD_DIR / filename
-        download_file(filename, dest)
-        time.sleep(RATE_LIMIT_DELAY)
+    # Output is streamed to a partial file and renamed once complete,
+    # so an interrupted run never leaves a truncated OUTPUT_FILE behind
+    partial_file = OUTPUT_FILE.with_suffix(".csv.part")
 
-    print()
+    # Summary, merged from the per-year summaries as their rows are written
+    total_rows = 0
+    reporters = set()
+    partners = set()
+    products = set()
+    periods = set()
+    total_value = 0.0
 
-    # ── 2. Extract and filter ────────────────────────────────
-    print("Stage 2: Extract & Filter")
-    print("-" * 40)
+    # Annual files are independent; fetch them concurrently and hand
+    # each archive to a filter process as soon as it is on disk, while
+    # later years are still downloading. Decompression and filtering
+    # are CPU-bound, so each year gets its own process ("spawn": the
+    # parent is running download and pipe threads). A FATAL exit in any
+    # worker re-raises here via Future.result().
+    filters = {}
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as download_pool, \
+         ProcessPoolExecutor(
+             max_workers=len(ANNUAL_FILES),
+             mp_context=multiprocessing.get_context("spawn"),
+         ) as filter_pool, \
+         open(partial_file, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(OUTPUT_COLUMNS)
+
+        downloads = {
+            download_pool.submit(download_file, filename, DOWNLOAD_DIR / filename): year
+            for year, filename in sorted(ANNUAL_FILES.items())
+        }
+
+        for future in as_completed(downloads):
+            future.result()
+            year = downloads[future]
+
+            archive = DOWNLOAD_DIR / ANNUAL_FILES[year]
+            if not archive.exists():
+                print(f"FATAL: archive not found: {archive}", file=sys.stderr)
+                sys.exit(1)
 
-    all_rows = []
-    extract_base = DOWNLOAD_DIR / "extracted"
-    extract_base.mkdir(parents=True, exist_ok=True)
+            filters[year] = filter_pool.submit(extract_and_filter, archive, cn8_codes, year)
 
-    for year, filename in sorted(ANNUAL_FILES.items()):
-        archive = DOWNLOAD_DIR / filename
-        if not archive.exists():
-            print(f"FATAL: archive not found: {archive}", file=sys.stderr)
-            sys.exit(1)
+        # Workers return only their filtered file and its summary; the
+        # files are appended in year order, without their header line
+        for year in sorted(filters):
+            (rows_path, y_rows, y_reporters, y_partners, y_products,
+             y_periods, y_value) = filters[year].result()
+            with open(rows_path, encoding="utf-8", newline="") as y:
+                y.readline()
+                shutil.copyfileobj(y, out)
 
-        year_dir = extract_base / str(year)
-        year_dir.mkdir(parents=True, exist_ok=True)
+            total_rows += y_rows
+            reporters |= y_reporters
+            partners |= y_partners
+            products |= y_products
+            periods |= y_periods
+            total_value += y_value
 
-        csv_path = extract_7z(archive, year_dir)
-        rows = filter_csv(csv_path, cn8_codes, year)
-        all_rows.extend(rows)
-        print()
+    os.replace(partial_file, OUTPUT_FILE)
 
     # ── 3. Write consolidated output ─────────────────────────
     print("Stage 3: Write Output")
     print("-" * 40)
 
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(OUTPUT_FILE, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
-        writer.writeheader()
-        writer.writerows(all_rows)
-
     output_size = OUTPUT_FILE.stat().st_size
     output_hash = sha256_file(OUTPUT_FILE)
 
     print(f"  Output: {OUTPUT_FILE}")
-    print(f"  Rows:   {len(all_rows):,}")
+    print(f"  Rows:   {total_rows:,}")
     print(f"  Size:   {output_size:,} bytes")
     print(f"  SHA256: {output_hash[:32]}...")
     print()
@@ -522,24 +701,7 @@ def main():
     print("SUMMARY")
     print("=" * 64)
 
-    # Count unique values
-    reporters = set()
-    partners = set()
-    products = set()
-    periods = set()
-    total_value = 0.0
-
-    for row in all_rows:
-        reporters.add(row["DECLARANT_ISO"])
-        partners.add(row["PARTNER_ISO"])
-        products.add(row["PRODUCT_NC"])
-        periods.add(row["PERIOD"])
-        try:
-            total_value += float(row["VALUE_IN_EUROS"])
-        except (ValueError, TypeError):
-            pass
-
-    print(f"  Total rows:       {len(all_rows):,}")
+    print(f"  Total rows:       {total_rows:,}")
     print(f"  Unique reporters: {len(reporters)} {sorted(reporters)}")
     print(f"  Unique partners:  {len(partners)}")
     print(f"  Unique CN8 codes: {len(products)}/66")
@@ -556,12 +718,8 @@ def main():
     else:
         print(f"  All 66 CN8 codes have data: OK")
 
-    expected_reporters = frozenset([
-        "AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE",
-        "EL", "ES", "FI", "FR", "HR", "HU", "IE", "IT",
-        "LT", "LU", "LV", "MT", "NL", "PL", "PT", "RO",
-        "SE", "SI", "SK",
-    ])
+    # Output uses ISI codes, so compare against the remapped reporter set
+    expected_reporters = frozenset(GEO_REMAP.get(c, c) for c in EU27_REPORTERS)
     missing_reporters = expected_reporters - reporters
     if missing_reporters:
         print(f"  WARNING: {len(missing_reporters)} EU-27 reporters missing:")
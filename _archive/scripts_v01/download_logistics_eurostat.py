@@ -26,10 +26,11 @@ Requirements: requests (already in venv)
 Task: ISI-LOGISTICS-DOWNLOAD
 """
 
-import csv
-import io
+import gzip
+import random
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
@@ -43,6 +44,14 @@ EUROSTAT_BASE = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data"
 # Timeout for HTTP requests (seconds)
 TIMEOUT = 180
 
+# Retry policy for Eurostat requests (transient 429/5xx are common)
+MAX_RETRIES = 5
+RETRY_BACKOFF_BASE = 5.0   # seconds, exponential backoff plus jitter
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Concurrent per-country maritime requests (polite cap for Eurostat)
+MARITIME_MAX_WORKERS = 4
+
 # ── Maritime reporters (22 non-landlocked EU-27) ─────────────
 MARITIME_REPORTERS = [
     "BE", "BG", "CY", "DE", "DK", "EE", "EL", "ES",
@@ -51,20 +60,51 @@ MARITIME_REPORTERS = [
 ]
 
 
+def get_with_retry(url: str, params: dict) -> requests.Response:
+    """GET with exponential backoff on transport errors and transient HTTP status.
+
+    Returns the final response; callers decide how to treat non-2xx codes.
+    """
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = requests.get(url, params=params, timeout=TIMEOUT)
+        except requests.RequestException as exc:
+            if attempt == MAX_RETRIES:
+                raise
+            reason = exc
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            reason = f"HTTP {response.status_code}"
+
+        wait = RETRY_BACKOFF_BASE * (2 ** (attempt - 1)) + random.uniform(0, 1)
+        print(f"    {url}: attempt {attempt}/{MAX_RETRIES} failed: {reason}; "
+              f"retrying in {wait:.0f}s...")
+        time.sleep(wait)
+
+
 def fetch_eurostat_csv(dataset_code: str, params: dict | None = None) -> str:
-    """Fetch a dataset from Eurostat in SDMX-CSV format."""
+    """Fetch a dataset from Eurostat in SDMX-CSV format.
+
+    The payload is requested gzip-compressed (SDMX-CSV is highly
+    repetitive) and inflated here before decoding.
+    """
     url = f"{EUROSTAT_BASE}/{dataset_code}/"
     default_params = {
         "format": "SDMX-CSV",
-        "compressed": "false",
+        "compressed": "true",
     }
     if params:
         default_params.update(params)
 
     print(f"  GET {url}")
-    response = requests.get(url, params=default_params, timeout=TIMEOUT)
+    response = get_with_retry(url, default_params)
     response.raise_for_status()
-    return response.text
+
+    payload = response.content
+    if payload[:2] == b"\x1f\x8b":
+        payload = gzip.decompress(payload)
+    return payload.decode("utf-8")
 
 
 def save_csv(raw_text: str, filepath: Path) -> int:
@@ -80,21 +120,28 @@ def save_csv(raw_text: str, filepath: Path) -> int:
 
 def fetch_and_save(dataset_code: str, filename: str,
                     params: dict | None = None) -> None:
-    """Fetch a Eurostat dataset and save as CSV."""
+    """Fetch a Eurostat dataset and save as CSV.
+
+    The per-dataset report is printed as one block after the fetch so
+    concurrent calls do not interleave their lines.
+    """
     filepath = RAW_DIR / filename
-    print(f"\n  Dataset: {dataset_code}")
-    print(f"  Output:  {filepath}")
 
     try:
         raw_text = fetch_eurostat_csv(dataset_code, params)
         rows = save_csv(raw_text, filepath)
-        size_kb = filepath.stat().st_size / 1024
-        print(f"  Rows:    {rows:,}")
-        print(f"  Size:    {size_kb:.1f} KB")
     except requests.RequestException as exc:
-        print(f"  ERROR: {exc}", file=sys.stderr)
+        print(f"\n  Dataset: {dataset_code}\n  ERROR: {exc}", file=sys.stderr)
         raise
 
+    size_kb = filepath.stat().st_size / 1024
+    print(
+        f"\n  Dataset: {dataset_code}\n"
+        f"  Output:  {filepath}\n"
+        f"  Rows:    {rows:,}\n"
+        f"  Size:    {size_kb:.1f} KB"
+    )
+
 
 def main() -> None:
     print("=" * 64)
@@ -130,17 +177,25 @@ def main() -> None:
     fetch_and_save("mar_go_am", "mar_go_am_all.csv")
 
     # Also try per-country tables if the aggregate is too large
-    # or doesn't have partner-level bilateral data
-    for iso2 in MARITIME_REPORTERS:
-        iso_lower = iso2.lower()
-        if iso2 == "EL":
-            iso_lower = "el"
-        filename = f"mar_go_am_{iso_lower}.csv"
-        try:
-            fetch_and_save(f"mar_go_am_{iso_lower}", filename)
-        except Exception:
-            print(f"  Skipped mar_go_am_{iso_lower} (not available)")
-        time.sleep(0.5)
+    # or doesn't have partner-level bilateral data. The tables are
+    # independent, so fetch them concurrently under a small cap
+    # instead of sequentially with a fixed sleep.
+    with ThreadPoolExecutor(max_workers=MARITIME_MAX_WORKERS) as pool:
+        futures = {}
+        for iso2 in MARITIME_REPORTERS:
+            iso_lower = iso2.lower()
+            if iso2 == "EL":
+                iso_lower = "el"
+            filename = f"mar_go_am_{iso_lower}.csv"
+            futures[iso_lower] = pool.submit(
+                fetch_and_save, f"mar_go_am_{iso_lower}", filename
+            )
+
+        for iso_lower, future in futures.items():
+            try:
+                future.result()
+            except Exception:
+                print(f"  Skipped mar_go_am_{iso_lower} (not available)")
 
     dt = time.time() - t_start
     print()
@@ -6,8 +6,10 @@ Writes per-country files as mar_go_am_{iso2}.csv.
 """
 import csv
 import io
+import random
 import sys
 import time
+from collections import defaultdict
 from pathlib import Path
 
 import requests
@@ -19,6 +21,11 @@ RAW_DIR.mkdir(parents=True, exist_ok=True)
 EUROSTAT_BASE = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data"
 TIMEOUT = 300
 
+# Retry policy for Eurostat requests (transient 429/5xx are common)
+MAX_RETRIES = 5
+RETRY_BACKOFF_BASE = 5.0   # seconds, exponential backoff plus jitter
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
 # Maritime reporters (non-landlocked EU-27)
 MARITIME_ISO2 = {
     "BE": "be", "BG": "bg", "CY": "cy", "DE": "de", "DK": "dk",
@@ -35,6 +42,32 @@ MARITIME_DATASETS = [
     "mar_go_aa",     # Maritime transport - goods - all ports
 ]
 
+# Header names that identify the reporting-country column
+GEO_COLUMN_ALIASES = frozenset({"geo", "rep_mar", "reporter"})
+
+
+def get_with_retry(url: str, params: dict) -> requests.Response:
+    """GET with exponential backoff on transport errors and transient HTTP status.
+
+    Returns the final response; callers decide how to treat non-2xx codes.
+    """
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = requests.get(url, params=params, timeout=TIMEOUT)
+        except requests.RequestException as exc:
+            if attempt == MAX_RETRIES:
+                raise
+            reason = exc
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            reason = f"HTTP {response.status_code}"
+
+        wait = RETRY_BACKOFF_BASE * (2 ** (attempt - 1)) + random.uniform(0, 1)
+        print(f"    {url}: attempt {attempt}/{MAX_RETRIES} failed: {reason}; "
+              f"retrying in {wait:.0f}s...")
+        time.sleep(wait)
+
 
 def try_download(dataset_code, params=None):
     """Try to download a dataset. Returns text or None."""
@@ -48,7 +81,7 @@ def try_download(dataset_code, params=None):
     
     print(f"  Trying {dataset_code}...")
     try:
-        resp = requests.get(url, params=default_params, timeout=TIMEOUT)
+        resp = get_with_retry(url, default_params)
         if resp.status_code == 200:
             lines = resp.text.strip().split("\n")
             print(f"    OK: {len(lines)-1} rows, {len(resp.text):,} bytes")
@@ -66,34 +99,34 @@ def try_download(dataset_code, params=None):
 
 def split_maritime_by_country(csv_text, geo_col="geo"):
     """Split a maritime CSV by country code, write per-country files."""
-    reader = csv.DictReader(io.StringIO(csv_text))
-    fieldnames = reader.fieldnames
+    reader = csv.reader(io.StringIO(csv_text))
+    fieldnames = next(reader, None)
     
     if fieldnames is None:
         print("  ERROR: no header in maritime CSV")
         return 0
     
     # Find the geo column
-    geo_column = None
-    for col in fieldnames:
-        if col.lower().strip() in ("geo", "rep_mar", "reporter"):
-            geo_column = col
-            break
+    geo_column = next(
+        (col for col in fieldnames if col.lower().strip() in GEO_COLUMN_ALIASES),
+        None,
+    )
     
     if geo_column is None:
         print(f"  ERROR: no geo column found. Headers: {fieldnames}")
         return 0
+    geo_idx = fieldnames.index(geo_column)
     
-    # Group rows by country
-    by_country = {}
+    # Group raw rows by country; written back unchanged in bulk below
+    by_country = defaultdict(list)
     for row in reader:
-        geo = row[geo_column].strip().upper()
+        if not row:
+            continue
+        geo = row[geo_idx].strip().upper()
         if geo == "GR":
             geo = "EL"
         if geo not in MARITIME_ISO2:
             continue
-        if geo not in by_country:
-            by_country[geo] = []
         by_country[geo].append(row)
     
     # Write per-country files
@@ -102,8 +135,8 @@ def split_maritime_by_country(csv_text, geo_col="geo"):
         iso_lower = MARITIME_ISO2[geo]
         filepath = RAW_DIR / f"mar_go_am_{iso_lower}.csv"
         with open(filepath, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
             writer.writerows(rows)
         print(f"    {geo}: {len(rows)} rows → {filepath.name}")
         count += 1
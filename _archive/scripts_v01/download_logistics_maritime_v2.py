@@ -12,11 +12,14 @@ does NOT have bilateral partner data and is NOT suitable.
 """
 import csv
 import io
+import json
 import sys
-import time
+from contextlib import ExitStack
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 RAW_DIR = PROJECT_ROOT / "data" / "raw" / "logistics"
@@ -25,6 +28,26 @@ RAW_DIR.mkdir(parents=True, exist_ok=True)
 EUROSTAT_BASE = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data"
 TIMEOUT = 300
 
+# Validators (ETag / Last-Modified) of the dataset last split and of
+# candidates found unusable, so a rerun sends only conditional GETs:
+# HTTP 304 reuses the files, or skips a candidate known to be unusable
+HTTP_CACHE_FILE = RAW_DIR / ".http_cache.json"
+
+# Per-country outputs are written row by row; buffer them in 1 MiB chunks
+WRITE_BUFFER_SIZE = 1 << 20
+
+# One keep-alive session for the dataset requests; transient 429/5xx
+# answers are retried with backoff, the last response is returned
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    ),
+))
+
 MARITIME_ISO2 = {
     "BE": "be", "BG": "bg", "CY": "cy", "DE": "de", "DK": "dk",
     "EE": "ee", "EL": "el", "ES": "es", "FI": "fi", "FR": "fr",
@@ -41,16 +64,81 @@ DATASETS_TO_TRY = [
 ]
 
 
-def download_and_check(ds_code):
-    """Download dataset and check if it has a partner column."""
+def load_http_cache():
+    """Load cached validators, keeping rejected candidates and the
+    entries whose files still exist."""
+    if not HTTP_CACHE_FILE.exists():
+        return {}
+    try:
+        with open(HTTP_CACHE_FILE, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        ds_code: entry for ds_code, entry in cache.items()
+        if entry.get("rejected")
+        or (entry.get("files") and all((RAW_DIR / n).exists() for n in entry["files"]))
+    }
+
+
+def record_http_cache(cache, ds_code, resp, files=None):
+    """Record the validators of an HTTP 200 response in cache.
+
+    With files, the per-country files were split from it; without, the
+    dataset was unusable and is marked rejected.
+    """
+    entry = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    if not (entry["etag"] or entry["last_modified"]):
+        cache.pop(ds_code, None)
+        return
+    if files:
+        # The per-country file names are shared across datasets, so only
+        # the dataset just split may keep a files entry
+        for other in [d for d, e in cache.items() if not e.get("rejected")]:
+            del cache[other]
+        entry["files"] = files
+    else:
+        entry["rejected"] = True
+    cache[ds_code] = entry
+
+
+def save_http_cache(cache):
+    """Write the cached validators."""
+    with open(HTTP_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+
+
+def download_and_check(ds_code, cached=None):
+    """Download dataset and check if it has a partner column.
+
+    Returns (response, usable): usable for HTTP 200 with a partner
+    column, or HTTP 304 for a dataset whose files are cached. HTTP 304
+    for a rejected dataset is not usable. The response is None if the
+    request failed.
+    """
     url = f"{EUROSTAT_BASE}/{ds_code}/"
     params = {"format": "SDMX-CSV", "compressed": "false"}
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
     print(f"\n  Trying {ds_code}...")
     try:
-        resp = requests.get(url, params=params, timeout=TIMEOUT)
+        resp = SESSION.get(url, params=params, headers=headers, timeout=TIMEOUT)
         print(f"    HTTP {resp.status_code}, size={len(resp.text):,}")
+        if resp.status_code == 304 and cached:
+            if cached.get("rejected"):
+                print(f"    Cache hit: not modified, still unusable")
+                return resp, False
+            print(f"    Cache hit: not modified, reusing {len(cached['files'])} files")
+            return resp, True
         if resp.status_code != 200:
-            return None
+            return resp, False
         
         lines = resp.text.strip().split("\n")
         header = lines[0]
@@ -68,23 +156,28 @@ def download_and_check(ds_code):
         print(f"    Rows: {len(lines)-1}")
         
         if has_partner:
-            return resp.text
+            return resp, True
         else:
             print(f"    SKIP: no partner column")
-            return None
+            return resp, False
             
     except requests.Timeout:
         print(f"    TIMEOUT")
-        return None
+        return None, False
     except Exception as e:
         print(f"    Error: {e}")
-        return None
+        return None, False
 
 
 def split_by_country(csv_text):
-    """Split CSV by reporter country, write per-country files."""
-    reader = csv.DictReader(io.StringIO(csv_text))
-    fieldnames = reader.fieldnames
+    """Split CSV by reporter country, write per-country files.
+
+    Single pass: each row goes straight to its country's writer, and a
+    file is opened the first time its country appears.
+    Returns the names of the files written.
+    """
+    reader = csv.reader(io.StringIO(csv_text))
+    fieldnames = next(reader, None) or []
     
     # Find reporter column
     reporter_col = None
@@ -95,33 +188,41 @@ def split_by_country(csv_text):
     
     if not reporter_col:
         print(f"  No reporter column found")
-        return 0
+        return []
+    reporter_idx = fieldnames.index(reporter_col)
     
-    # Group by country
-    by_country = {}
-    for row in reader:
-        geo = row[reporter_col].strip().upper()
-        if geo == "GR":
-            geo = "EL"
-        if geo not in MARITIME_ISO2:
-            continue
-        if geo not in by_country:
-            by_country[geo] = []
-        by_country[geo].append(row)
+    # Dispatch rows to per-country files
+    writers = {}
+    counts = {}
+    with ExitStack() as stack:
+        for row in reader:
+            if not row:
+                continue
+            geo = row[reporter_idx].strip().upper()
+            if geo == "GR":
+                geo = "EL"
+            if geo not in MARITIME_ISO2:
+                continue
+            writer = writers.get(geo)
+            if writer is None:
+                filepath = RAW_DIR / f"mar_go_am_{MARITIME_ISO2[geo]}.csv"
+                f = stack.enter_context(open(
+                    filepath, "w", encoding="utf-8", newline="",
+                    buffering=WRITE_BUFFER_SIZE,
+                ))
+                writer = writers[geo] = csv.writer(f)
+                writer.writerow(fieldnames)
+                counts[geo] = 0
+            writer.writerow(row)
+            counts[geo] += 1
     
-    # Write per-country files
-    count = 0
-    for geo, rows in sorted(by_country.items()):
-        iso_lower = MARITIME_ISO2[geo]
-        filepath = RAW_DIR / f"mar_go_am_{iso_lower}.csv"
-        with open(filepath, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-        print(f"    {geo}: {len(rows)} rows → {filepath.name}")
-        count += 1
+    written = []
+    for geo, n in sorted(counts.items()):
+        filename = f"mar_go_am_{MARITIME_ISO2[geo]}.csv"
+        print(f"    {geo}: {n} rows → {filename}")
+        written.append(filename)
     
-    return count
+    return written
 
 
 def main():
@@ -129,17 +230,27 @@ def main():
     print("Maritime Bilateral Freight Download (corrected)")
     print("=" * 64)
     
+    http_cache = load_http_cache()
+
+    # Candidates are fetched in preference order; a fallback dataset is
+    # only requested when every dataset before it was unusable, so a
+    # rerun whose preferred dataset answers HTTP 304 makes one request
     for ds_code in DATASETS_TO_TRY:
-        text = download_and_check(ds_code)
-        if text:
-            n = split_by_country(text)
-            if n > 0:
-                print(f"\n  SUCCESS: {n} per-country files from {ds_code}")
-                break
-        time.sleep(2)
+        resp, usable = download_and_check(ds_code, http_cache.get(ds_code))
+        if usable and resp.status_code == 304:
+            n = len(http_cache[ds_code]["files"])
+            print(f"\n  SUCCESS: {n} per-country files from {ds_code} (cached)")
+            break
+        files = split_by_country(resp.text) if usable else []
+        if resp is not None and resp.status_code == 200:
+            record_http_cache(http_cache, ds_code, resp, files)
+        if files:
+            print(f"\n  SUCCESS: {len(files)} per-country files from {ds_code}")
+            break
     else:
         print("\nFAILED: No bilateral maritime dataset found.")
         print("Parser will proceed without maritime data.")
+    save_http_cache(http_cache)
     
     print("\n" + "=" * 64)
     print("Maritime files:")
@@ -3,8 +3,10 @@
 Extract & Filter Script (local execution)
 
 Reads the 3 annual .7z files already present in
-data/raw/comext_bulk/, extracts and filters to the 66-CN8
-material universe, and writes a consolidated CSV.
+data/raw/comext_bulk/, stream-decompresses and filters them to
+the 66-CN8 material universe, and writes a consolidated CSV.
+A .dat previously extracted to data/raw/comext_bulk/extracted/<year>/
+is read from disk instead.
 
 This is the execution-only version — no download stage.
 
@@ -13,8 +15,14 @@ Task: ISI-CRIT-EXTRACT
 
 import csv
 import hashlib
+import io
+import os
+import shutil
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 import py7zr
@@ -76,58 +84,118 @@ PERIOD_REMAP = {"202252": "2022", "202352": "2023", "202452": "2024"}
 
 
 def load_cn8_codes() -> frozenset:
-    codes = set()
     with open(MAPPING_FILE, "r", encoding="utf-8", newline="") as f:
-        for row in csv.DictReader(f):
-            codes.add(row["cn8_code"].strip())
+        reader = csv.reader(f)
+        i_code = next(reader, []).index("cn8_code")
+        codes = frozenset(row[i_code].strip() for row in reader if row)
     assert len(codes) == 66, f"Expected 66 CN8 codes, got {len(codes)}"
-    return frozenset(codes)
+    return codes
 
 
 def sha256(path: Path) -> str:
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        while chunk := f.read(65536):
-            h.update(chunk)
-    return h.hexdigest()
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 
-def extract_and_filter(archive: Path, cn8: frozenset, year: int) -> list:
-    """Extract one .7z, stream-filter its .dat, return kept rows."""
-    t0 = time.time()
-    year_dir = EXTRACT_DIR / str(year)
-    year_dir.mkdir(parents=True, exist_ok=True)
-
-    # ── Check if already extracted ───────────────────────────
-    existing_dats = list(year_dir.glob("*.dat")) + list(year_dir.glob("*.csv"))
-    if existing_dats:
-        dat_path = existing_dats[0]
-        print(f"  Using existing: {dat_path.name} "
-              f"({dat_path.stat().st_size / (1024**2):.0f} MB)")
-    else:
-        print(f"  Extracting: {archive.name} ...", flush=True)
-        with py7zr.SevenZipFile(archive, mode="r") as z:
-            names = z.getnames()
-            dat_names = [n for n in names
-                         if n.lower().endswith((".dat", ".csv"))]
-            if not dat_names:
-                print(f"FATAL: no .dat/.csv in {archive.name}: {names}",
-                      file=sys.stderr)
-                sys.exit(1)
-            z.extractall(path=year_dir)
-        dat_path = year_dir / dat_names[0]
-        dt = time.time() - t0
-        print(f"    Extracted: {dat_path.name} "
-              f"({dat_path.stat().st_size / (1024**2):.0f} MB) "
-              f"in {dt:.0f}s")
+class _PipeWriter(py7zr.io.Py7zIO):
+    """Write-only py7zr sink that forwards decompressed bytes to a pipe."""
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self._size = 0
+
+    def write(self, s) -> int:
+        self._pipe.write(s)
+        self._size += len(s)
+        return len(s)
+
+    def read(self, size=None) -> bytes:
+        raise io.UnsupportedOperation("write-only stream")
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        raise io.UnsupportedOperation("write-only stream")
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        self._pipe.flush()
+
+    def size(self) -> int:
+        return self._size
+
+
+class _PipeWriterFactory(py7zr.io.WriterFactory):
+    """Hand py7zr a _PipeWriter for the (single) extracted member."""
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+
+    def create(self, filename: str) -> _PipeWriter:
+        return _PipeWriter(self._pipe)
 
+
+@contextmanager
+def stream_7z(archive_path: Path):
+    """Decompress the .dat member of a .7z archive as a text stream.
+
+    Decompression runs in a background thread that writes into an OS
+    pipe; the caller reads the other end, so the multi-GB member is
+    never written to disk. Yields (member_name, text_stream).
+    """
+    print(f"  Streaming: {archive_path.name}", flush=True)
+
+    with py7zr.SevenZipFile(archive_path, mode="r") as z:
+        names = z.getnames()
+        dat_names = [n for n in names
+                     if n.lower().endswith((".dat", ".csv"))]
+        if not dat_names:
+            print(f"FATAL: no .dat/.csv in {archive_path.name}: {names}",
+                  file=sys.stderr)
+            sys.exit(1)
+
+        # Use the first (typically only) .dat/.csv member
+        dat_name = dat_names[0]
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def decompress():
+            with open(write_fd, "wb") as pipe:
+                try:
+                    z.extract(targets=[dat_name], factory=_PipeWriterFactory(pipe))
+                except Exception as e:  # reported by the consumer
+                    errors.append(e)
+
+        worker = threading.Thread(target=decompress, daemon=True)
+        worker.start()
+
+        stream = open(read_fd, "r", encoding="utf-8", newline="")
+        try:
+            yield dat_name, stream
+        finally:
+            # Closing the read end unblocks the worker if we stopped early
+            stream.close()
+            worker.join()
+
+    if errors:
+        print(f"FATAL: decompression of {archive_path.name} failed: {errors[0]}", file=sys.stderr)
+        sys.exit(1)
+
+
+def filter_stream(f, name: str, cn8: frozenset, year: int, out) -> tuple:
+    """Stream-filter an open Comext .dat text stream positioned at its header.
+
+    Kept rows are written to the csv writer `out` as they are found.
+    Returns (kept, reporters, partners, products, periods, total_eur);
+    the summary sets and value total are collected while filtering.
+    """
     # ── Detect separator ─────────────────────────────────────
-    with open(dat_path, "r", encoding="utf-8") as f:
-        hdr = f.readline()
+    hdr = f.readline()
     sep = "\t" if "\t" in hdr else (";" if ";" in hdr else ",")
+    fieldnames = next(csv.reader([hdr], delimiter=sep), [])
 
     # ── Stream filter ────────────────────────────────────────
-    print(f"  Filtering: {dat_path.name} (year={year}, sep={repr(sep)})",
+    print(f"  Filtering: {name} (year={year}, sep={repr(sep)})",
           flush=True)
     t1 = time.time()
 
@@ -140,57 +208,79 @@ def extract_and_filter(archive: Path, cn8: frozenset, year: int) -> list:
     d_partner = 0
     d_val = 0
     zeros = 0
-    rows = []
-
-    with open(dat_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f, delimiter=sep)
-
-        # ── Validate columns ─────────────────────────────────
-        missing = [c for c in REQUIRED_COLS if c not in reader.fieldnames]
-        if missing:
-            print(f"FATAL: missing columns: {missing}", file=sys.stderr)
-            print(f"  Found: {reader.fieldnames}", file=sys.stderr)
-            sys.exit(1)
-        print(f"    Columns: {reader.fieldnames[:8]}...")
-
-        for row in reader:
-            total += 1
-            if total % 2_000_000 == 0:
-                print(f"    ... {total:>10,} scanned, {kept:>8,} kept",
-                      flush=True)
-
-            # Flow: imports only (1)
-            if row[COL_FLOW].strip() != "1":
-                d_flow += 1
-                continue
-
-            # Stat procedure: normal only (1)
-            if row[COL_STAT_PROC].strip() != "1":
-                d_proc += 1
-                continue
-
-            # Reporter: EU-27
-            reporter = row[COL_REPORTER].strip()
-            if reporter not in EU27:
-                d_geo += 1
-                continue
-
-            # Product: 66 CN8 codes
-            product = row[COL_PRODUCT].strip()
-            if product not in cn8:
-                d_prod += 1
-                continue
-
-            # Partner: drop Q-prefix confidential
-            partner = row[COL_PARTNER].strip()
-            if partner in DROP_PARTNERS:
-                d_partner += 1
-                continue
+    write_row = out.writerow
+    reporters = set()
+    partners = set()
+    products = set()
+    periods = set()
+    total_eur = 0.0
 
-            # Value
-            val_s = row[COL_VALUE].strip()
-            if val_s in ("", ":", "c"):
-                val_s = "0"
+    # ── Validate columns ─────────────────────────────────────
+    missing = [c for c in REQUIRED_COLS if c not in fieldnames]
+    if missing:
+        print(f"FATAL: missing columns: {missing}", file=sys.stderr)
+        print(f"  Found: {fieldnames}", file=sys.stderr)
+        sys.exit(1)
+
+    # Resolve column positions once; rows are read as plain lists
+    i_flow = fieldnames.index(COL_FLOW)
+    i_proc = fieldnames.index(COL_STAT_PROC)
+    i_reporter = fieldnames.index(COL_REPORTER)
+    i_product = fieldnames.index(COL_PRODUCT)
+    i_partner = fieldnames.index(COL_PARTNER)
+    i_value = fieldnames.index(COL_VALUE)
+    i_period = fieldnames.index(COL_PERIOD)
+
+    # Remap lookups resolved once per year rather than per kept row
+    declarant_of = {r: GEO_REMAP.get(r, r) for r in EU27}
+    default_period = str(year)
+
+    for row in csv.reader(f, delimiter=sep):
+        if not row:
+            continue
+        total += 1
+        if total % 2_000_000 == 0:
+            print(f"    {name}: {total:>10,} scanned, "
+                  f"{kept:>8,} kept", flush=True)
+
+        # Flow: imports only (1)
+        if row[i_flow].strip() != "1":
+            d_flow += 1
+            continue
+
+        # Stat procedure: normal only (1)
+        if row[i_proc].strip() != "1":
+            d_proc += 1
+            continue
+
+        # Reporter: EU-27
+        reporter = row[i_reporter].strip()
+        if reporter not in EU27:
+            d_geo += 1
+            continue
+
+        # Product: 66 CN8 codes
+        product = row[i_product].strip()
+        if product not in cn8:
+            d_prod += 1
+            continue
+
+        # Partner: drop Q-prefix confidential
+        partner = row[i_partner].strip()
+        if partner in DROP_PARTNERS:
+            d_partner += 1
+            continue
+
+        # Value
+        val_s = row[i_value].strip()
+        if val_s in ("", ":", "c"):
+            val_s = "0"
+        if len(val_s) <= 15 and val_s.isascii() and val_s.isdigit():
+            # Plain non-negative integer (the usual case): exact as a
+            # float, so the digits are emitted without reformatting
+            val = float(val_s)
+            val_out = val_s.lstrip("0") or "0"
+        else:
             try:
                 val = float(val_s)
             except (ValueError, TypeError):
@@ -199,27 +289,69 @@ def extract_and_filter(archive: Path, cn8: frozenset, year: int) -> list:
             if val < 0:
                 d_val += 1
                 continue
-            if val == 0:
-                zeros += 1
-
-            # ── Remap and emit ───────────────────────────────
-            period_raw = row[COL_PERIOD].strip()
-            rows.append({
-                "DECLARANT_ISO": GEO_REMAP.get(reporter, reporter),
-                "PARTNER_ISO": partner,
-                "PRODUCT_NC": product,
-                "FLOW": "1",
-                "PERIOD": PERIOD_REMAP.get(period_raw, str(year)),
-                "VALUE_IN_EUROS": str(int(val)) if val == int(val) else str(val),
-            })
-            kept += 1
+            val_out = str(int(val)) if val == int(val) else str(val)
+        if val == 0:
+            zeros += 1
+
+        # ── Remap and emit (OUTPUT_COLS order) ───────────────
+        declarant = declarant_of[reporter]
+        period = PERIOD_REMAP.get(row[i_period].strip(), default_period)
+        write_row((
+            declarant,
+            partner,
+            product,
+            "1",
+            period,
+            val_out,
+        ))
+        kept += 1
+
+        reporters.add(declarant)
+        partners.add(partner)
+        products.add(product)
+        periods.add(period)
+        total_eur += val
 
     dt = time.time() - t1
-    print(f"    Done: {total:,} total → {kept:,} kept  ({dt:.0f}s)")
-    print(f"      flow:{d_flow:,}  proc:{d_proc:,}  geo:{d_geo:,}  "
+    # One write, so concurrent years do not interleave their blocks
+    print(f"── Year {year} ──\n"
+          f"  Filtered: {name}\n"
+          f"    Columns: {fieldnames[:8]}...\n"
+          f"    Done: {total:,} total → {kept:,} kept  ({dt:.0f}s)\n"
+          f"      flow:{d_flow:,}  proc:{d_proc:,}  geo:{d_geo:,}  "
           f"prod:{d_prod:,}  partner:{d_partner:,}  val:{d_val:,}  "
-          f"zeros:{zeros:,}")
-    return rows
+          f"zeros:{zeros:,}\n", flush=True)
+    return kept, reporters, partners, products, periods, total_eur
+
+
+def extract_and_filter(archive: Path, cn8: frozenset, year: int) -> tuple:
+    """Stream-decompress one .7z and filter its .dat; see filter_stream.
+
+    Top-level so it can run in a worker process (one per year). A .dat
+    already extracted under EXTRACT_DIR/<year> is read from disk instead.
+    Kept rows go to a headerless per-year file under EXTRACT_DIR, so only
+    its path and the summary travel back to the parent.
+    Returns (rows_path, kept, reporters, partners, products, periods,
+    total_eur).
+    """
+    EXTRACT_DIR.mkdir(parents=True, exist_ok=True)
+    rows_path = EXTRACT_DIR / f"filtered_{year}.csv.part"
+
+    year_dir = EXTRACT_DIR / str(year)
+    existing_dats = sorted(year_dir.glob("*.dat")) + sorted(year_dir.glob("*.csv"))
+    with open(rows_path, "w", encoding="utf-8", newline="") as out:
+        w = csv.writer(out)
+        if existing_dats:
+            dat_path = existing_dats[0]
+            print(f"  Using existing: {dat_path.name} "
+                  f"({dat_path.stat().st_size / (1024**2):.0f} MB)", flush=True)
+            with open(dat_path, "r", encoding="utf-8", newline="") as f:
+                summary = filter_stream(f, dat_path.name, cn8, year, w)
+        else:
+            with stream_7z(archive) as (dat_name, f):
+                summary = filter_stream(f, dat_name, cn8, year, w)
+
+    return (rows_path, *summary)
 
 
 def main():
@@ -241,37 +373,51 @@ def main():
         print(f"  {fname}: {p.stat().st_size / (1024**2):.1f} MB")
     print()
 
-    # ── Extract & Filter each year ───────────────────────────
-    EXTRACT_DIR.mkdir(parents=True, exist_ok=True)
-    all_rows = []
-
-    for year, fname in sorted(ANNUAL_FILES.items()):
-        print(f"── Year {year} ──")
-        rows = extract_and_filter(BULK_DIR / fname, cn8, year)
-        all_rows.extend(rows)
-        print()
-
-    # ── Write output ─────────────────────────────────────────
+    # ── Extract, filter & write each year ───────────────────
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=OUTPUT_COLS)
-        w.writeheader()
-        w.writerows(all_rows)
 
-    h = sha256(OUTPUT_FILE)
+    # Output is streamed to a partial file and renamed once complete,
+    # so an interrupted run never leaves a truncated OUTPUT_FILE behind
+    partial_file = OUTPUT_FILE.with_suffix(".csv.part")
 
-    # ── Summary ──────────────────────────────────────────────
+    # Summary, merged from the per-year results as they are written
+    n_rows = 0
     reporters = set()
     partners = set()
     products = set()
     periods = set()
     total_eur = 0.0
-    for r in all_rows:
-        reporters.add(r["DECLARANT_ISO"])
-        partners.add(r["PARTNER_ISO"])
-        products.add(r["PRODUCT_NC"])
-        periods.add(r["PERIOD"])
-        total_eur += float(r["VALUE_IN_EUROS"])
+
+    # Years are independent and CPU-bound; each runs in its own process.
+    # A FATAL exit in any worker re-raises here via Future.result().
+    with ProcessPoolExecutor(max_workers=len(ANNUAL_FILES)) as pool, \
+         open(partial_file, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(OUTPUT_COLS)
+
+        futures = {
+            year: pool.submit(extract_and_filter, BULK_DIR / fname, cn8, year)
+            for year, fname in sorted(ANNUAL_FILES.items())
+        }
+
+        # Workers return only their per-year file and summary; the files
+        # are appended in year order and removed once copied
+        for year in sorted(futures):
+            (rows_path, y_rows, y_reporters, y_partners, y_products,
+             y_periods, y_eur) = futures[year].result()
+            with open(rows_path, "r", encoding="utf-8", newline="") as y:
+                shutil.copyfileobj(y, f)
+            rows_path.unlink()
+
+            n_rows += y_rows
+            reporters |= y_reporters
+            partners |= y_partners
+            products |= y_products
+            periods |= y_periods
+            total_eur += y_eur
+
+    partial_file.replace(OUTPUT_FILE)
+    h = sha256(OUTPUT_FILE)
 
     dt_total = time.time() - t_start
 
@@ -281,7 +427,7 @@ def main():
     print(f"  File:     {OUTPUT_FILE}")
     print(f"  Size:     {OUTPUT_FILE.stat().st_size:,} bytes")
     print(f"  SHA-256:  {h}")
-    print(f"  Rows:     {len(all_rows):,}")
+    print(f"  Rows:     {n_rows:,}")
     print(f"  Reporters:{len(reporters)} {sorted(reporters)}")
     print(f"  Partners: {len(partners)}")
     print(f"  CN8 codes:{len(products)}/66")
@@ -1,6 +1,7 @@
 """ISI v0.1 — Energy Axis Scope Enforcement (EU-27, 2024)"""
 
 import csv
+from operator import itemgetter
 from pathlib import Path
 
 INPUT_ENERGY = Path("data/processed/energy/energy_dependency_2024.csv")
@@ -11,12 +12,10 @@ OUTPUT_AUDIT = OUTPUT_DIR / "energy_dependency_2024_scope_audit.csv"
 
 
 def load_scope(scope_path):
-    geo_set = set()
     with open(scope_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            geo_set.add(row["geo"])
-    return geo_set
+        reader = csv.reader(f)
+        i_geo = next(reader, []).index("geo")
+        return {row[i_geo] for row in reader if row}
 
 
 def main():
@@ -24,36 +23,35 @@ def main():
 
     eu27_geos = load_scope(INPUT_SCOPE)
 
-    rows = []
     with open(INPUT_ENERGY, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
+        reader = csv.reader(f)
+        header = next(reader, [])
+        i_geo = header.index("geo")
+        i_dep = header.index("energy_dependency")
+        rows = [(row[i_geo], row[i_dep]) for row in reader if row]
+    rows.sort(key=itemgetter(0))
 
     included = []
     audit = []
 
-    for row in sorted(rows, key=lambda r: r["geo"]):
-        geo = row["geo"]
+    for geo, dep in rows:
         if geo in eu27_geos:
-            included.append(row)
-            audit.append({"geo": geo, "status": "INCLUDED_EU27"})
+            included.append((geo, dep))
+            audit.append((geo, "INCLUDED_EU27"))
         else:
-            audit.append({"geo": geo, "status": "EXCLUDED_NOT_EU27"})
+            audit.append((geo, "EXCLUDED_NOT_EU27"))
 
     with open(OUTPUT_EU27, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["geo", "energy_dependency"])
-        writer.writeheader()
-        for row in included:
-            writer.writerow(row)
+        writer = csv.writer(f)
+        writer.writerow(["geo", "energy_dependency"])
+        writer.writerows(included)
 
     print(f"EU-27 filtered: {len(included)} rows → {OUTPUT_EU27}")
 
     with open(OUTPUT_AUDIT, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["geo", "status"])
-        writer.writeheader()
-        for row in audit:
-            writer.writerow(row)
+        writer = csv.writer(f)
+        writer.writerow(["geo", "status"])
+        writer.writerows(audit)
 
     print(f"Scope audit: {len(audit)} rows → {OUTPUT_AUDIT}")
 
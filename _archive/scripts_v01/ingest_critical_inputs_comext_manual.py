@@ -22,7 +22,12 @@ Task: ISI-CRIT-INGEST
 """
 
 import csv
+import io
+import mmap
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -62,12 +67,17 @@ EU27 = frozenset([
 # Both are accepted as valid EU-27 reporters.
 EU27_WITH_GR = EU27 | {"GR"}
 
-VALID_YEARS = {"2022", "2023", "2024"}
+VALID_YEARS = frozenset(["2022", "2023", "2024"])
 
-REJECT_REPORTER_PATTERNS = {
+REJECT_REPORTER_PATTERNS = frozenset([
     "EU27_2020", "EU28", "EU27_2007", "EU25", "EU15",
     "EA19", "EA20", "EFTA",
-}
+])
+
+# Large unquoted files are validated in parallel, one line-aligned byte
+# range per worker; smaller files are not worth the process start-up
+VALIDATION_WORKERS = os.cpu_count() or 1
+MIN_CHUNK_BYTES = 16 << 20
 
 
 def load_mapping_codes():
@@ -97,6 +107,151 @@ def load_mapping_codes():
     return codes
 
 
+def split_data_range():
+    """Split the data rows of RAW_FILE into line-aligned byte ranges.
+
+    Returns one (start, end) range per worker, or None when the file
+    should be read as a single stream: when it is too small to split, or
+    when it contains a quote character, since a quoted field may span
+    lines and a split at a newline could then cut a record in two.
+    """
+    size = RAW_FILE.stat().st_size
+    n = min(VALIDATION_WORKERS, size // MIN_CHUNK_BYTES)
+    if n < 2:
+        return None
+
+    with open(RAW_FILE, "rb") as f, \
+         mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm.find(b'"') != -1:
+            return None
+        # Unquoted, so the header is exactly the first line
+        data_start = mm.find(b"\n") + 1
+        if data_start == 0:
+            return None
+        bounds = [data_start]
+        for i in range(1, n):
+            cut = mm.find(b"\n", data_start + (size - data_start) * i // n)
+            bounds.append(size if cut == -1 else cut + 1)
+        bounds.append(size)
+
+    return list(zip(bounds, bounds[1:]))
+
+
+def validate_chunk(start, end, cols, mapping_codes):
+    """Validate the rows in one byte range of RAW_FILE (worker entry point)."""
+    with open(RAW_FILE, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return validate_rows(csv.reader(io.StringIO(text, newline="")), cols, mapping_codes)
+
+
+def validate_rows(rows, cols, mapping_codes):
+    """Apply the row-level checks (steps 3–7) to parsed CSV rows.
+
+    Returns (counts, reporters, cn8_codes, partners, years), where counts
+    holds, in order: total rows, rows kept, zero-value rows and the eight
+    drop-reason counters. Results of separate ranges are merged by summing
+    the counts and taking the union of the sets.
+    """
+    i_decl, i_part, i_prod, i_flow, i_period, i_value = cols
+
+    total_rows = 0
+    rows_kept = 0
+    zero_value_count = 0
+
+    # Drop-reason counters
+    dropped_flow = 0
+    dropped_year_invalid = 0
+    dropped_product_not_8digit = 0
+    dropped_product_not_in_mapping = 0
+    dropped_reporter_aggregate = 0
+    dropped_reporter_not_eu27 = 0
+    dropped_value_non_numeric = 0
+    dropped_value_negative = 0
+
+    reporters_seen = set()
+    cn8_codes_seen = set()
+    partners_seen = set()
+    years_seen = set()
+
+    for row in rows:
+        if not row:
+            continue
+        total_rows += 1
+
+        # Fields are stripped just before their first check, so rows
+        # dropped early never strip the remaining columns
+
+        # ── 6. Flow validation ───────────────────────────────────
+        flow = row[i_flow].strip()
+        if flow != "1":
+            dropped_flow += 1
+            continue
+
+        # ── 5. Temporal validation ───────────────────────────────
+        period = row[i_period].strip()
+        if period not in VALID_YEARS:
+            dropped_year_invalid += 1
+            continue
+        years_seen.add(period)
+
+        # ── 3. CN8 code validation ───────────────────────────────
+        product = row[i_prod].strip()
+        # isdigit() alone also accepts non-ASCII digits such as "²"
+        if len(product) != 8 or not (product.isascii() and product.isdigit()):
+            dropped_product_not_8digit += 1
+            continue
+
+        if product not in mapping_codes:
+            dropped_product_not_in_mapping += 1
+            continue
+
+        # ── 4. Geographic validation ─────────────────────────────
+        declarant = row[i_decl].strip()
+        if declarant in REJECT_REPORTER_PATTERNS:
+            dropped_reporter_aggregate += 1
+            continue
+
+        if declarant not in EU27_WITH_GR:
+            dropped_reporter_not_eu27 += 1
+            continue
+
+        # ── 7. Value validation ──────────────────────────────────
+        try:
+            value = float(row[i_value].strip())
+        except (ValueError, TypeError):
+            dropped_value_non_numeric += 1
+            continue
+
+        if value < 0:
+            dropped_value_negative += 1
+            continue
+
+        if value == 0:
+            zero_value_count += 1
+
+        # Row passes all checks
+        rows_kept += 1
+        reporters_seen.add(declarant)
+        cn8_codes_seen.add(product)
+        partners_seen.add(row[i_part].strip())
+
+    counts = (
+        total_rows,
+        rows_kept,
+        zero_value_count,
+        dropped_flow,
+        dropped_year_invalid,
+        dropped_product_not_8digit,
+        dropped_product_not_in_mapping,
+        dropped_reporter_aggregate,
+        dropped_reporter_not_eu27,
+        dropped_value_non_numeric,
+        dropped_value_negative,
+    )
+    return counts, reporters_seen, cn8_codes_seen, partners_seen, years_seen
+
+
 def main():
     print("=" * 64)
     print("ISI v0.1 — Axis 5: Critical Inputs Ingest Gate")
@@ -125,103 +280,61 @@ def main():
     print(f"  File exists: {RAW_FILE.stat().st_size:,} bytes")
     print()
 
-    # ── 2. Column validation ─────────────────────────────────────
+    # The header is validated on the same reader that then streams the
+    # rows, unless the data is split into byte ranges for the workers
     with open(RAW_FILE, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
-    if fieldnames is None:
-        print("FATAL: could not read CSV header.", file=sys.stderr)
-        sys.exit(1)
-
-    print(f"Columns found ({len(fieldnames)}): {fieldnames}")
-    missing_cols = [c for c in REQUIRED_COLUMNS if c not in fieldnames]
-    if missing_cols:
-        print(f"FATAL: missing required columns: {missing_cols}", file=sys.stderr)
-        sys.exit(1)
-    print(f"  All {len(REQUIRED_COLUMNS)} required columns present.")
-    print()
-
-    # ── 3–7. Row-level validation ────────────────────────────────
-    total_rows = 0
-    rows_kept = 0
-    zero_value_count = 0
+        reader = csv.reader(f)
 
-    # Drop-reason counters
-    dropped_flow = 0
-    dropped_year_invalid = 0
-    dropped_product_not_8digit = 0
-    dropped_product_not_in_mapping = 0
-    dropped_reporter_aggregate = 0
-    dropped_reporter_not_eu27 = 0
-    dropped_value_non_numeric = 0
-    dropped_value_negative = 0
+        # ── 2. Column validation ─────────────────────────────────
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            print("FATAL: could not read CSV header.", file=sys.stderr)
+            sys.exit(1)
 
-    reporters_seen = set()
-    cn8_codes_seen = set()
-    partners_seen = set()
-    years_seen = set()
+        print(f"Columns found ({len(fieldnames)}): {fieldnames}")
+        header_set = frozenset(fieldnames)
+        missing_cols = [c for c in REQUIRED_COLUMNS if c not in header_set]
+        if missing_cols:
+            print(f"FATAL: missing required columns: {missing_cols}", file=sys.stderr)
+            sys.exit(1)
+        print(f"  All {len(REQUIRED_COLUMNS)} required columns present.")
+        print()
 
-    with open(RAW_FILE, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total_rows += 1
-
-            declarant = row["DECLARANT_ISO"].strip()
-            partner = row["PARTNER_ISO"].strip()
-            product = row["PRODUCT_NC"].strip()
-            flow = row["FLOW"].strip()
-            period = row["PERIOD"].strip()
-            value_str = row["VALUE_IN_EUROS"].strip()
-
-            # ── 6. Flow validation ───────────────────────────────
-            if flow != "1":
-                dropped_flow += 1
-                continue
-
-            # ── 5. Temporal validation ───────────────────────────
-            if period not in VALID_YEARS:
-                dropped_year_invalid += 1
-                continue
-            years_seen.add(period)
-
-            # ── 3. CN8 code validation ───────────────────────────
-            if len(product) != 8 or not product.isdigit():
-                dropped_product_not_8digit += 1
-                continue
-
-            if product not in mapping_codes:
-                dropped_product_not_in_mapping += 1
-                continue
-
-            # ── 4. Geographic validation ─────────────────────────
-            if declarant in REJECT_REPORTER_PATTERNS:
-                dropped_reporter_aggregate += 1
-                continue
-
-            if declarant not in EU27_WITH_GR:
-                dropped_reporter_not_eu27 += 1
-                continue
-
-            # ── 7. Value validation ──────────────────────────────
-            try:
-                value = float(value_str)
-            except (ValueError, TypeError):
-                dropped_value_non_numeric += 1
-                continue
-
-            if value < 0:
-                dropped_value_negative += 1
-                continue
-
-            if value == 0:
-                zero_value_count += 1
-
-            # Row passes all checks
-            rows_kept += 1
-            reporters_seen.add(declarant)
-            cn8_codes_seen.add(product)
-            partners_seen.add(partner)
+        # ── 3–7. Row-level validation ────────────────────────────
+        # Resolve column positions once; rows are read as plain lists
+        cols = tuple(fieldnames.index(c) for c in REQUIRED_COLUMNS)
+
+        chunks = split_data_range()
+        if chunks is None:
+            results = [validate_rows(reader, cols, mapping_codes)]
+        else:
+            print(f"Validating {len(chunks)} byte ranges in parallel ...")
+            print()
+            starts, ends = zip(*chunks)
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                results = list(pool.map(
+                    validate_chunk, starts, ends,
+                    repeat(cols), repeat(mapping_codes),
+                ))
+
+    # ── Merge per-range results ──────────────────────────────────
+    (
+        total_rows,
+        rows_kept,
+        zero_value_count,
+        dropped_flow,
+        dropped_year_invalid,
+        dropped_product_not_8digit,
+        dropped_product_not_in_mapping,
+        dropped_reporter_aggregate,
+        dropped_reporter_not_eu27,
+        dropped_value_non_numeric,
+        dropped_value_negative,
+    ) = (sum(c) for c in zip(*(r[0] for r in results)))
+    reporters_seen = set().union(*(r[1] for r in results))
+    cn8_codes_seen = set().union(*(r[2] for r in results))
+    partners_seen = set().union(*(r[3] for r in results))
+    years_seen = set().union(*(r[4] for r in results))
 
     # ── Compute totals ───────────────────────────────────────────
     total_dropped = (
@@ -241,9 +354,7 @@ def main():
 
     # ── Reporter coverage check ──────────────────────────────────
     # Normalise GR → EL for coverage comparison
-    reporters_normalised = set()
-    for r in reporters_seen:
-        reporters_normalised.add("EL" if r == "GR" else r)
+    reporters_normalised = {"EL" if r == "GR" else r for r in reporters_seen}
     eu27_missing = EU27 - reporters_normalised
 
     # ── 8. Audit summary ─────────────────────────────────────────
@@ -23,7 +23,9 @@ Task: ISI-DEFENSE-INGEST
 """
 
 import csv
+import io
 import sys
+from itertools import chain
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -42,6 +44,9 @@ REQUIRED_FIELDS_PATTERNS = [
     "year(s) of deliver",
 ]
 
+# Data rows are counted in 1 MiB chunks rather than parsed row by row
+READ_CHUNK_SIZE = 1 << 20
+
 
 def main():
     print(f"Checking: {RAW_FILE}")
@@ -63,16 +68,42 @@ def main():
     # Read header and count rows
     # SIPRI CSV encoding fix: file contains Latin-1 chars (e.g. Wärtsilä, Göteborg)
     with open(RAW_FILE, "r", encoding="latin-1", newline="") as f:
-        reader = csv.reader(f)
-        # SIPRI CSV compatibility fix (2024 format): skip 11 metadata lines
+        # SIPRI CSV compatibility fix (2024 format): skip 11 metadata lines.
+        # They are skipped as physical lines, not CSV records, so quoting
+        # in the metadata cannot shift the header position.
         for _ in range(11):
-            next(reader)
+            f.readline()
+        reader = csv.reader(f)
         header = next(reader)
         header_lower = [h.strip().lower() for h in header]
 
+        # Only a count is needed: without quote characters every line
+        # ending (\n, \r\n or a bare \r) ends exactly one record, so the
+        # rest of the file is counted in chunks without building a list
+        # per row. The unfinished last line of a chunk (including a
+        # trailing \r that may be half of \r\n) is carried into the next,
+        # so each chunk starts at a record boundary. Quoted fields may
+        # span lines, so from the first chunk with a quote on, the rest
+        # of the file is parsed by a streaming csv.reader instead.
         row_count = 0
-        for _ in reader:
-            row_count += 1
+        carry = ""
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                if carry:
+                    row_count += 1
+                break
+            chunk = carry + chunk
+            if '"' in chunk:
+                # Complete the chunk's last line so the reader sees the
+                # chunk and the rest of the file as whole lines
+                lines = io.StringIO(chunk + f.readline(), newline="")
+                row_count += sum(1 for _ in csv.reader(chain(lines, f)))
+                break
+            cut = max(chunk.rfind("\n"), chunk.rfind("\r", 0, len(chunk) - 1)) + 1
+            body = chunk[:cut]
+            carry = chunk[cut:]
+            row_count += body.count("\n") + body.count("\r") - body.count("\r\n")
 
     print(f"  Header columns ({len(header)}): {header}")
     print(f"  Data rows: {row_count}")
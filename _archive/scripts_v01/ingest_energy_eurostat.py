@@ -2,9 +2,11 @@
 ISI v0.1 — Eurostat Energy Import Ingestion (Raw, 2024)
 """
 
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 EUROSTAT_BASE_URL = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data"
 
@@ -31,25 +33,53 @@ QUERY_PARAMS = {
 
 OUTPUT_DIR = Path("data/raw/eurostat")
 
+# Responses are stored verbatim, streamed to disk in 1 MiB chunks
+DOWNLOAD_CHUNK_SIZE = 1 << 20
 
-def fetch_dataset(dataset_id: str) -> dict:
+# Shared by the concurrent fetches so connections to Eurostat are reused;
+# transient 429/5xx answers are retried with backoff (requests already
+# asks for gzip and decodes it while streaming)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    ),
+))
+
+
+def fetch_dataset(dataset_id: str, output_path: Path) -> None:
     url = f"{EUROSTAT_BASE_URL}/{dataset_id}/{SDMX_KEY}"
-    response = requests.get(url, params=QUERY_PARAMS, timeout=120)
-    response.raise_for_status()
-    return response.json()
+    # The JSON is not inspected here, so the body is written as received
+    # rather than decoded and re-serialized; a .part file is renamed into
+    # place once complete
+    partial_path = output_path.with_name(output_path.name + ".part")
+    with SESSION.get(url, params=QUERY_PARAMS, timeout=120, stream=True) as response:
+        response.raise_for_status()
+        with open(partial_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    partial_path.replace(output_path)
 
 
 def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    for dataset_id, filename in DATASETS.items():
-        print(f"Fetching {dataset_id} ...")
-        raw = fetch_dataset(dataset_id)
-        output_path = OUTPUT_DIR / filename
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(raw, f, ensure_ascii=False)
-        print(f"Saved {output_path}")
+    # The datasets are independent: fetch them concurrently, then report
+    # them in DATASETS order
+    with ThreadPoolExecutor(max_workers=len(DATASETS)) as pool:
+        futures = {}
+        for dataset_id, filename in DATASETS.items():
+            print(f"Fetching {dataset_id} ...")
+            output_path = OUTPUT_DIR / filename
+            futures[output_path] = pool.submit(fetch_dataset, dataset_id, output_path)
+
+        for output_path, future in futures.items():
+            future.result()
+            print(f"Saved {output_path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
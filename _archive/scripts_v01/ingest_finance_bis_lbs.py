@@ -3,6 +3,8 @@
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BIS_API_BASE = "https://stats.bis.org/api/v2/data/dataflow/BIS/WS_LBS_D_PUB/1.0"
 
@@ -36,17 +38,36 @@ QUERY_PARAMS = {
 OUTPUT_DIR = Path("data/raw/finance")
 OUTPUT_FILE = OUTPUT_DIR / "bis_lbs_2024_raw.csv"
 
+# The full LBS pull can run to hundreds of MB; stream it in 1 MiB chunks
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Transient 429/5xx answers from the BIS API are retried with backoff;
+# requests already asks for gzip and decodes it while streaming
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    ),
+))
+
 
 def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     url = f"{BIS_API_BASE}/{SDMX_KEY}"
     print(f"Fetching BIS LBS (2024-Q4) ...")
-    response = requests.get(url, params=QUERY_PARAMS, timeout=300)
-    response.raise_for_status()
-
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write(response.text)
+    # Stream to a .part file and rename it into place once complete, so a
+    # failed download never replaces a previous good file
+    partial_file = OUTPUT_FILE.with_name(OUTPUT_FILE.name + ".part")
+    with SESSION.get(url, params=QUERY_PARAMS, timeout=300, stream=True) as response:
+        response.raise_for_status()
+        with open(partial_file, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    partial_file.replace(OUTPUT_FILE)
 
     print(f"Saved {OUTPUT_FILE}")
 
@@ -12,17 +12,18 @@ Task: ISI-FINANCE-INGEST-CPIS-MANUAL
 """
 
 import sys
+import xml.etree.ElementTree as ET
+import zipfile
 from pathlib import Path
 
-try:
-    import openpyxl
-except ImportError:
-    print("FATAL: openpyxl is not installed. Run: pip install openpyxl", file=sys.stderr)
-    sys.exit(1)
-
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 RAW_FILE = PROJECT_ROOT / "data" / "raw" / "finance" / "cpis_2024_raw.xlsx"
 
+# An .xlsx is a ZIP archive; the sheet list lives in xl/workbook.xml, so
+# it can be read without loading shared strings, styles or cell data
+WORKBOOK_PART = "xl/workbook.xml"
+SHEET_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet"
+
 
 def main():
     # ── Check 1: file exists ──
@@ -40,20 +41,18 @@ def main():
 
     # ── Check 2: file is readable as xlsx ──
     try:
-        wb = openpyxl.load_workbook(RAW_FILE, read_only=True, data_only=True)
+        with zipfile.ZipFile(RAW_FILE) as zf:
+            workbook = ET.fromstring(zf.read(WORKBOOK_PART))
     except Exception as exc:
         print(f"FATAL: cannot read file as xlsx: {exc}", file=sys.stderr)
         sys.exit(1)
 
     # ── Check 3: at least one sheet ──
-    sheet_names = wb.sheetnames
+    sheet_names = [el.get("name") for el in workbook.iter(SHEET_TAG)]
     if len(sheet_names) == 0:
         print("FATAL: workbook contains zero sheets", file=sys.stderr)
-        wb.close()
         sys.exit(1)
 
-    wb.close()
-
     # ── Report ──
     print(f"OK: raw file validated: {RAW_FILE}")
     print(f"    file size: {RAW_FILE.stat().st_size} bytes")
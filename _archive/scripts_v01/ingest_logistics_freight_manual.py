@@ -31,13 +31,19 @@ Task: ISI-LOGISTICS-INGEST
 """
 
 import csv
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 RAW_DIR = PROJECT_ROOT / "data" / "raw" / "logistics"
 
+# Mode files are tens of MB; read them in 1 MiB chunks
+READ_BUFFER_SIZE = 1 << 20
+
 # ──────────────────────────────────────────────────────────────
 # EU-27 canonical set (ISI standard)
 # ──────────────────────────────────────────────────────────────
@@ -49,6 +55,9 @@ EU27 = frozenset([
     "SE", "SI", "SK",
 ])
 
+# Row order of the coverage matrix
+EU27_SORTED = tuple(sorted(EU27))
+
 # GR is Eurostat's code for Greece; ISI uses EL.
 EU27_WITH_GR = EU27 | {"GR"}
 
@@ -130,15 +139,21 @@ FLOW_PATTERNS = ["flow", "direct", "direction"]
 UNIT_PATTERNS = ["unit"]
 
 
-def detect_column(fieldnames, patterns, label):
-    """Return the first fieldname matching any pattern (case-insensitive).
-    Returns None if no match found."""
-    lower_fields = {f: f.lower().strip() for f in fieldnames}
-    for pattern in patterns:
-        for original, lower in lower_fields.items():
-            if pattern in lower:
-                return original
-    return None
+def detect_columns(fieldnames, pattern_lists):
+    """Return, for each pattern list, the first fieldname matching any
+    pattern (case-insensitive), or None if no match found.
+
+    The header is lowercased once for all lists. Within a list, patterns
+    are tried in order, so an earlier pattern wins over an earlier field."""
+    lower_fields = [(f, f.lower().strip()) for f in fieldnames]
+    return tuple(
+        next(
+            (original for pattern in patterns
+             for original, lower in lower_fields if pattern in lower),
+            None,
+        )
+        for patterns in pattern_lists
+    )
 
 
 def normalise_geo(code):
@@ -162,6 +177,18 @@ def is_aggregate(code):
     return False
 
 
+def classify_geo(code):
+    """Classify a stripped geo code once for the row loop.
+    Returns (ISI code, is aggregate, is EU-27 member)."""
+    isi_code = normalise_geo(code)
+    return (isi_code, is_aggregate(code), isi_code in EU27)
+
+
+# Seed table of classified geo codes; validate_mode_file extends a copy
+# with every other code it meets, so each distinct code is classified once
+GEO_CLASS = {code: classify_geo(code) for code in EU27_WITH_GR | REJECT_AGGREGATES}
+
+
 def looks_like_prohibited_mode(filepath):
     """Check if a filepath suggests air or pipeline data."""
     name_lower = filepath.name.lower()
@@ -222,9 +249,12 @@ def validate_mode_file(filepath, mode_name, partner_patterns_override=None):
         "fatal_reason": None,
     }
 
+    # Row counters are kept in locals during the loop and stored in
+    # result afterwards; every dropped row counts under exactly one reason
+    drop_reasons = Counter()
+
     def drop(reason):
-        result["rows_dropped"] += 1
-        result["drop_reasons"][reason] = result["drop_reasons"].get(reason, 0) + 1
+        drop_reasons[reason] += 1
 
     # ── Prohibited mode check ────────────────────────────────
     if looks_like_prohibited_mode(filepath):
@@ -237,14 +267,17 @@ def validate_mode_file(filepath, mode_name, partner_patterns_override=None):
 
     # ── Open and detect columns ──────────────────────────────
     try:
-        f = open(filepath, "r", encoding="utf-8", newline="")
+        f = open(
+            filepath, "r", encoding="utf-8", newline="",
+            buffering=READ_BUFFER_SIZE,
+        )
     except Exception as exc:
         result["fatal"] = True
         result["fatal_reason"] = f"Cannot open file: {exc}"
         return result
 
-    reader = csv.DictReader(f)
-    fieldnames = reader.fieldnames
+    reader = csv.reader(f)
+    fieldnames = next(reader, None)
 
     if fieldnames is None or len(fieldnames) == 0:
         f.close()
@@ -254,12 +287,11 @@ def validate_mode_file(filepath, mode_name, partner_patterns_override=None):
 
     p_patterns = partner_patterns_override if partner_patterns_override else PARTNER_PATTERNS
 
-    col_reporter = detect_column(fieldnames, REPORTER_PATTERNS, "reporter")
-    col_partner = detect_column(fieldnames, p_patterns, "partner")
-    col_value = detect_column(fieldnames, VALUE_PATTERNS, "value")
-    col_time = detect_column(fieldnames, TIME_PATTERNS, "time")
-    col_flow = detect_column(fieldnames, FLOW_PATTERNS, "flow")
-    col_unit = detect_column(fieldnames, UNIT_PATTERNS, "unit")
+    (col_reporter, col_partner, col_value,
+     col_time, col_flow, col_unit) = detect_columns(fieldnames, (
+        REPORTER_PATTERNS, p_patterns, VALUE_PATTERNS,
+        TIME_PATTERNS, FLOW_PATTERNS, UNIT_PATTERNS,
+    ))
 
     # ── Partner dimension: HARD FAIL if missing ──────────────
     if col_partner is None:
@@ -303,58 +335,88 @@ def validate_mode_file(filepath, mode_name, partner_patterns_override=None):
         return result
 
     # ── Row-level validation ─────────────────────────────────
+    # Rows are read as lists and indexed by position. As with DictReader,
+    # a repeated header name resolves to its last column and blank lines
+    # are skipped; short rows are padded so missing fields read as "".
+    field_index = {name: i for i, name in enumerate(fieldnames)}
+    i_reporter = field_index[col_reporter]
+    i_partner = field_index[col_partner]
+    i_value = field_index[col_value]
+    i_time = field_index[col_time]
+    i_flow = field_index[col_flow] if col_flow is not None else None
+    i_unit = field_index[col_unit] if col_unit is not None else None
+    row_width = 1 + max(
+        i for i in (i_reporter, i_partner, i_value, i_time, i_flow, i_unit)
+        if i is not None
+    )
+
+    geo_class = dict(GEO_CLASS)
+    rows_scanned = 0
+    rows_kept = 0
+    zero_value_rows = 0
+    total_tonnage = 0.0
+    reporters = result["reporters"]
+    partners = result["partners"]
+    years = result["years"]
+
     for row in reader:
-        result["rows_scanned"] += 1
+        if len(row) < row_width:
+            if not row:
+                continue
+            row += [""] * (row_width - len(row))
+        rows_scanned += 1
 
         # --- Reporter ---
-        raw_reporter = row.get(col_reporter, "").strip()
+        raw_reporter = row[i_reporter].strip()
         if raw_reporter == "":
             drop("reporter_empty")
             continue
 
-        reporter = normalise_geo(raw_reporter)
+        geo = geo_class.get(raw_reporter)
+        if geo is None:
+            geo = geo_class[raw_reporter] = classify_geo(raw_reporter)
+        reporter, aggregate, eu27 = geo
 
-        if is_aggregate(raw_reporter):
+        if aggregate:
             drop("reporter_aggregate")
             continue
 
-        if reporter not in EU27:
+        if not eu27:
             drop("reporter_not_eu27")
             continue
 
         # --- Partner ---
-        raw_partner = row.get(col_partner, "").strip()
+        raw_partner = row[i_partner].strip()
         if raw_partner == "":
             drop("partner_empty")
             continue
 
-        if is_aggregate(raw_partner):
+        geo = geo_class.get(raw_partner)
+        if geo is None:
+            geo = geo_class[raw_partner] = classify_geo(raw_partner)
+        partner, aggregate, _ = geo
+
+        if aggregate:
             drop("partner_aggregate")
             continue
 
         # --- Time ---
-        raw_time = row.get(col_time, "").strip()
-        if not is_annual(raw_time):
-            # Check if this is monthly/quarterly → FAIL mode
-            if raw_time and not raw_time.isdigit():
-                drop("time_not_annual")
-                continue
-            if raw_time and len(raw_time) != 4:
-                drop("time_not_annual")
-                continue
-            if raw_time == "":
-                drop("time_empty")
-                continue
-            drop("time_not_annual")
-            continue
-
+        raw_time = row[i_time].strip()
+        # Kept rows need only the membership test; the rest are
+        # classified for the drop reason
         if raw_time not in VALID_YEARS:
-            drop("year_outside_window")
+            if is_annual(raw_time):
+                drop("year_outside_window")
+            elif raw_time == "":
+                drop("time_empty")
+            else:
+                # Monthly/quarterly or malformed → FAIL mode
+                drop("time_not_annual")
             continue
 
         # --- Flow (if present) ---
         if col_flow is not None:
-            raw_flow = row.get(col_flow, "").strip().upper()
+            raw_flow = row[i_flow].strip().upper()
             # Eurostat flow codes vary:
             #   road/rail: no explicit flow (data is directional by table)
             #   maritime: direct dimension (INWARD, OUTWARD, TOTAL)
@@ -370,7 +432,7 @@ def validate_mode_file(filepath, mode_name, partner_patterns_override=None):
 
         # --- Unit (if present, verify tonnes) ---
         if col_unit is not None:
-            raw_unit = row.get(col_unit, "").strip().upper()
+            raw_unit = row[i_unit].strip().upper()
             # Accept: THS_T (thousand tonnes), T (tonnes), THS_T (Eurostat)
             # Also accept MIO_TKM for rail if THS_T absent, but log
             # Reject: PC (percentage), NR (number), EUR
@@ -379,23 +441,30 @@ def validate_mode_file(filepath, mode_name, partner_patterns_override=None):
                 continue
 
         # --- Value ---
-        raw_value = row.get(col_value, "").strip()
+        raw_value = row[i_value].strip()
         value, err = parse_value(raw_value)
         if err is not None:
             drop(f"value_{err}")
             continue
 
         if value == 0.0:
-            result["zero_value_rows"] += 1
+            zero_value_rows += 1
 
         # ── Row passes all checks ───────────────────────────
-        result["rows_kept"] += 1
-        result["reporters"].add(reporter)
-        result["partners"].add(normalise_geo(raw_partner))
-        result["years"].add(raw_time)
-        result["total_tonnage"] += value
+        rows_kept += 1
+        reporters.add(reporter)
+        partners.add(partner)
+        years.add(raw_time)
+        total_tonnage += value
 
     f.close()
+
+    result["rows_scanned"] = rows_scanned
+    result["rows_kept"] = rows_kept
+    result["rows_dropped"] = sum(drop_reasons.values())
+    result["drop_reasons"] = dict(drop_reasons)
+    result["zero_value_rows"] = zero_value_rows
+    result["total_tonnage"] = total_tonnage
     return result
 
 
@@ -455,11 +524,19 @@ def main():
         key = f"maritime_{isi_code}"
         expected_files[key] = RAW_DIR / f"mar_go_am_{iso2}.csv"
 
+    # One directory scan gives existence and size for every expected file
+    file_sizes = {
+        entry.name: entry.stat().st_size
+        for entry in os.scandir(RAW_DIR)
+        if entry.is_file()
+    }
+
     missing_files = []
     for key, fpath in sorted(expected_files.items()):
-        exists = fpath.exists()
+        size = file_sizes.get(fpath.name)
+        exists = size is not None
         status = "FOUND" if exists else "MISSING"
-        size_str = f"{fpath.stat().st_size:,} bytes" if exists else ""
+        size_str = f"{size:,} bytes" if exists else ""
         print(f"  [{status:7s}] {fpath.name:30s} {size_str}")
         if not exists:
             missing_files.append((key, fpath))
@@ -481,61 +558,67 @@ def main():
 
     mode_results = {}
 
+    # The mode files are independent: validate all of them in worker
+    # processes up front, then report below in the usual order
+    partner_overrides = {
+        "road_loaded": ["c_unload", "partner", "c_load"],
+        "road_unloaded": ["c_load", "c_unload", "partner"],
+        "rail": ["c_unload", "partner"],
+        "iww": ["c_unload", "partner", "c_load"],
+    }
+    for isi_code in MARITIME_ISO2_FILE:
+        partner_overrides[f"maritime_{isi_code}"] = ["par_mar", "partner", "c_unload"]
+
+    futures = {}
+    with ProcessPoolExecutor() as pool:
+        for key, patterns in partner_overrides.items():
+            if expected_files[key].name in file_sizes:
+                futures[key] = pool.submit(
+                    validate_mode_file,
+                    expected_files[key],
+                    key,
+                    partner_patterns_override=patterns,
+                )
+
     # -- ROAD (loaded) --
-    if expected_files["road_loaded"].exists():
+    if "road_loaded" in futures:
         print("-" * 68)
         print("ROAD — loaded goods (road_go_ia_lgtt)")
         print("-" * 68)
-        r = validate_mode_file(
-            expected_files["road_loaded"],
-            "road_loaded",
-            partner_patterns_override=["c_unload", "partner", "c_load"],
-        )
+        r = futures["road_loaded"].result()
         mode_results["road_loaded"] = r
         print_mode_result(r)
         if r["fatal"]:
             fatal_errors.append(f"ROAD loaded: {r['fatal_reason']}")
 
     # -- ROAD (unloaded) --
-    if expected_files["road_unloaded"].exists():
+    if "road_unloaded" in futures:
         print("-" * 68)
         print("ROAD — unloaded goods (road_go_ia_ugtt)")
         print("-" * 68)
-        r = validate_mode_file(
-            expected_files["road_unloaded"],
-            "road_unloaded",
-            partner_patterns_override=["c_load", "c_unload", "partner"],
-        )
+        r = futures["road_unloaded"].result()
         mode_results["road_unloaded"] = r
         print_mode_result(r)
         if r["fatal"]:
             fatal_errors.append(f"ROAD unloaded: {r['fatal_reason']}")
 
     # -- RAIL --
-    if expected_files["rail"].exists():
+    if "rail" in futures:
         print("-" * 68)
         print("RAIL — international goods (rail_go_intgong)")
         print("-" * 68)
-        r = validate_mode_file(
-            expected_files["rail"],
-            "rail",
-            partner_patterns_override=["c_unload", "partner"],
-        )
+        r = futures["rail"].result()
         mode_results["rail"] = r
         print_mode_result(r)
         if r["fatal"]:
             fatal_errors.append(f"RAIL: {r['fatal_reason']}")
 
     # -- IWW --
-    if expected_files["iww"].exists():
+    if "iww" in futures:
         print("-" * 68)
         print("IWW — inland waterways (iww_go_atygo)")
         print("-" * 68)
-        r = validate_mode_file(
-            expected_files["iww"],
-            "iww",
-            partner_patterns_override=["c_unload", "partner", "c_load"],
-        )
+        r = futures["iww"].result()
         mode_results["iww"] = r
         print_mode_result(r)
         if r["fatal"]:
@@ -554,18 +637,13 @@ def main():
     maritime_file_count = 0
     maritime_fatals = []
 
-    for isi_code, iso2 in sorted(MARITIME_ISO2_FILE.items()):
+    for isi_code in sorted(MARITIME_ISO2_FILE):
         key = f"maritime_{isi_code}"
-        fpath = expected_files[key]
-        if not fpath.exists():
+        if key not in futures:
             continue
 
         maritime_file_count += 1
-        r = validate_mode_file(
-            fpath,
-            f"maritime_{isi_code}",
-            partner_patterns_override=["par_mar", "partner", "c_unload"],
-        )
+        r = futures[key].result()
         mode_results[key] = r
 
         if r["fatal"]:
@@ -635,12 +713,19 @@ def main():
 
     reporters_maritime = maritime_combined_reporters
 
+    # EU-27 coverage per mode, used by the enforcement and the summary
+    road_eu = reporters_road & EU27
+    rail_eu = reporters_rail & EU27
+    maritime_eu = reporters_maritime & EU27
+    maritime_covered = reporters_maritime & MARITIME_REPORTERS
+    iww_eu = reporters_iww & EU27
+
     # Print matrix
     header_line = f"  {'Country':<10s} {'Road':>6s} {'Rail':>6s} {'Marit':>6s} {'IWW':>6s}"
     print(header_line)
     print("  " + "-" * len(header_line.strip()))
 
-    for country in sorted(EU27):
+    for country in EU27_SORTED:
         road_ok = "YES" if country in reporters_road else "---"
         rail_ok = "YES" if country in reporters_rail else "---"
         mar_ok = "YES" if country in reporters_maritime else "---"
@@ -653,49 +738,49 @@ def main():
     # Road
     missing_road = EU27 - reporters_road
     unexpected_missing_road = missing_road - ROAD_ALLOWED_MISSING
-    print(f"  Road reporters:    {len(reporters_road & EU27)}/27")
+    print(f"  Road reporters:    {len(road_eu)}/27")
     if missing_road:
         print(f"    Missing: {sorted(missing_road)}")
         if unexpected_missing_road:
             for m in sorted(unexpected_missing_road):
                 print(f"    UNEXPECTED missing road reporter: {m}")
-    if len(reporters_road & EU27) < ROAD_MIN_REPORTERS:
+    if len(road_eu) < ROAD_MIN_REPORTERS:
         fatal_errors.append(
-            f"Road coverage: {len(reporters_road & EU27)}/27 reporters, "
+            f"Road coverage: {len(road_eu)}/27 reporters, "
             f"minimum required: {ROAD_MIN_REPORTERS}/27"
         )
 
     # Rail
     missing_rail = EU27 - reporters_rail
     unexpected_missing_rail = missing_rail - RAIL_ALLOWED_MISSING
-    print(f"  Rail reporters:    {len(reporters_rail & EU27)}/27")
+    print(f"  Rail reporters:    {len(rail_eu)}/27")
     if missing_rail:
         print(f"    Missing: {sorted(missing_rail)}")
         if unexpected_missing_rail:
             for m in sorted(unexpected_missing_rail):
                 print(f"    UNEXPECTED missing rail reporter: {m}")
-    if len(reporters_rail & EU27) < RAIL_MIN_REPORTERS:
+    if len(rail_eu) < RAIL_MIN_REPORTERS:
         fatal_errors.append(
-            f"Rail coverage: {len(reporters_rail & EU27)}/27 reporters, "
+            f"Rail coverage: {len(rail_eu)}/27 reporters, "
             f"minimum required: {RAIL_MIN_REPORTERS}/27"
         )
 
     # Maritime
     missing_maritime = MARITIME_REPORTERS - reporters_maritime
-    print(f"  Maritime reporters: {len(reporters_maritime & EU27)}/27 "
+    print(f"  Maritime reporters: {len(maritime_eu)}/27 "
           f"(22 expected, 5 landlocked excluded)")
     if missing_maritime:
         print(f"    Missing maritime: {sorted(missing_maritime)}")
-    if len(reporters_maritime & MARITIME_REPORTERS) < MARITIME_MIN_REPORTERS:
+    if len(maritime_covered) < MARITIME_MIN_REPORTERS:
         fatal_errors.append(
-            f"Maritime coverage: {len(reporters_maritime & MARITIME_REPORTERS)}/22 "
+            f"Maritime coverage: {len(maritime_covered)}/22 "
             f"maritime reporters, minimum required: {MARITIME_MIN_REPORTERS}/22"
         )
 
     # IWW
-    print(f"  IWW reporters:     {len(reporters_iww & EU27)}/27 (partial expected)")
+    print(f"  IWW reporters:     {len(iww_eu)}/27 (partial expected)")
     if reporters_iww:
-        print(f"    Present: {sorted(reporters_iww & EU27)}")
+        print(f"    Present: {sorted(iww_eu)}")
     missing_iww = EU27 - reporters_iww
     if missing_iww:
         print(f"    Missing: {sorted(missing_iww)}")
@@ -774,10 +859,10 @@ def main():
     print(f"  Directory:         {RAW_DIR}")
     print(f"  Modes validated:   road, rail, maritime, iww")
     print(f"  Total rows kept:   {total_kept:,}")
-    print(f"  Road reporters:    {len(reporters_road & EU27)}/27")
-    print(f"  Rail reporters:    {len(reporters_rail & EU27)}/27")
-    print(f"  Maritime reporters: {len(reporters_maritime & MARITIME_REPORTERS)}/22")
-    print(f"  IWW reporters:     {len(reporters_iww & EU27)}/27")
+    print(f"  Road reporters:    {len(road_eu)}/27")
+    print(f"  Rail reporters:    {len(rail_eu)}/27")
+    print(f"  Maritime reporters: {len(maritime_covered)}/22")
+    print(f"  IWW reporters:     {len(iww_eu)}/27")
     print(f"  Years:             2022, 2023, 2024")
     print()
 